@@ -2,25 +2,95 @@ import os
 import hashlib
 import secrets
 import uuid
-import base64
+try:
+    import pybase64 as base64  # SIMD-accelerated drop-in for the stdlib module
+except ImportError:
+    import base64
 import json
+import time
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import functools
+import threading
 from dotenv import load_dotenv
 import mysql.connector
+from mysql.connector import pooling
+
+load_dotenv()
+
+# Connection settings, read from the environment once at import rather than on
+# every (re)connect
+HOMEWORK_DB_CONFIG = {
+    "host": os.getenv("HOMEWORK_DB_HOST"),
+    "user": os.getenv("HOMEWORK_DB_USER"),
+    "password": os.getenv("HOMEWORK_DB_PASS"),
+    "database": os.getenv("HOMEWORK_DB_NAME"),
+    # Writes are grouped into explicit transactions and committed once
+    "autocommit": False,
+}
+HOMEWORK_DB_POOL_SIZE = int(os.getenv("HOMEWORK_DB_POOL_SIZE", "8"))
+HOMEWORK_DB_POOL_TIMEOUT = float(os.getenv("HOMEWORK_DB_POOL_TIMEOUT", "5"))
+
+
+def _format_image(image_data, image_extension, image_format):
+    """
+    Returns image bytes from the images table as raw bytes ("bytes"), base64
+    text ("base64") or a data URI ("data_uri"). Only the last two pay for encoding.
+    """
+    image_data = bytes(image_data)
+    if image_format == "bytes":
+        return image_data
+    encoded = base64.b64encode(image_data).decode("ascii")
+    if image_format == "base64":
+        return encoded
+    if image_format == "data_uri":
+        subtype = (image_extension or "png").lower().lstrip(".")
+        if subtype == "jpg":
+            subtype = "jpeg"
+        return f"data:image/{subtype};base64,{encoded}"
+    raise ValueError(f"Unknown image_format: {image_format}")
+
+
+def _pooled(method):
+    """
+    Check a pooled connection out for the duration of a DatabaseManager method.
+    get_connection() inside the method (and any method it calls) returns that
+    connection, which goes back to the pool when the outermost call returns.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        local = self._local
+        if getattr(local, "connection", None) is not None:
+            return method(self, *args, **kwargs)
+        local.connection = self._checkout_connection()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            connection, local.connection = local.connection, None
+            try:
+                if connection is not None:
+                    connection.close()
+            except Exception as exc:
+                print(f"❌ Error returning database connection: {exc}")
+
+    return wrapper
 
 
 class DatabaseManager:
     """
     Unified database manager that combines all database operations.
-    Singleton class for managing database connections and CRUD operations.
+    Singleton class for managing a database connection pool and CRUD operations.
     Handles user authentication, homework assignments, submissions, and image storage.
     """
 
     _instance = None
-    _mydb = None
+    _pool = None
     _initialized = False
 
+    # Seconds list_assignments_cached() reuses a result without a local write,
+    # so changes made by other processes still show up
+    ASSIGNMENTS_CACHE_TTL = 60
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(DatabaseManager, cls).__new__(cls)
@@ -28,58 +98,52 @@ class DatabaseManager:
 
     def __init__(self):
         if not self._initialized:
-            self._mydb = self._configure_database()
+            self._local = threading.local()
+            self._pool = self._configure_database()
+            self._assignments_version = 0
+            self._assignments_cache = {}
             self._initialized = True
 
     def _configure_database(self):
-        """Configure and return a MySQL database connection."""
-        load_dotenv()
-        host = os.getenv("HOMEWORK_DB_HOST")
-        user = os.getenv("HOMEWORK_DB_USER")
-        password = os.getenv("HOMEWORK_DB_PASS")
-        database = os.getenv("HOMEWORK_DB_NAME")
-
+        """Configure and return a MySQL connection pool."""
         try:
-            mydb = mysql.connector.connect(
-                host=host,
-                user=user,
-                password=password,
-                database=database,
+            pool = pooling.MySQLConnectionPool(
+                pool_name="homework",
+                pool_size=HOMEWORK_DB_POOL_SIZE,
+                **HOMEWORK_DB_CONFIG,
             )
-            print("✅ Database connection established successfully")
-            return mydb
+            print("✅ Database connection pool established successfully")
+            return pool
         except Exception as exc:
             print(f"❌ Error connecting to database: {exc}")
             return None
 
-    @property
-    def mydb(self):
-        """Return the underlying MySQL connection object, or None if not connected."""
-        return self._mydb
-
-    def get_connection(self):
-        """Return an active connection, attempting to reconnect if needed."""
+    def _checkout_connection(self):
+        """
+        Take a connection from the pool. If every connection is in use, wait up
+        to HOMEWORK_DB_POOL_TIMEOUT seconds for one to be returned, then give up.
+        """
         try:
-            if self._mydb and self._mydb.is_connected():
-                return self._mydb
-            print("🔄 Reconnecting to database...")
-            self._mydb = self._configure_database()
-            return self._mydb
+            if self._pool is None:
+                print("🔄 Reconnecting to database...")
+                self._pool = self._configure_database()
+            if self._pool is None:
+                return None
+            deadline = time.monotonic() + HOMEWORK_DB_POOL_TIMEOUT
+            while True:
+                try:
+                    return self._pool.get_connection()
+                except mysql.connector.errors.PoolError:
+                    if time.monotonic() >= deadline:
+                        raise
+                    time.sleep(0.05)
         except Exception as exc:
             print(f"❌ Error getting database connection: {exc}")
             return None
 
-    def close_connection(self):
-        """Close the database connection if open."""
-        try:
-            if self._mydb and self._mydb.is_connected():
-                self._mydb.close()
-                print("✅ Database connection closed")
-        except Exception as exc:
-            print(f"❌ Error closing database connection: {exc}")
-
-    def __del__(self):
-        self.close_connection()
+    def get_connection(self):
+        """Return the connection checked out for the current call, or None if not connected."""
+        return getattr(self._local, "connection", None)
 
     # =============================================================================
     # USER MANAGEMENT METHODS
@@ -93,6 +157,7 @@ class DatabaseManager:
         """Verify a password against its hash."""
         return self._hash_password(password) == hashed_password
 
+    @_pooled
     def create_user(self, user_data: Dict[str, Any]) -> Optional[int]:
         """
         Create a new user account.
@@ -174,6 +239,7 @@ class DatabaseManager:
             except Exception:
                 pass
 
+    @_pooled
     def authenticate_user(self, username: str, password: str) -> Optional[Dict[str, Any]]:
         """
         Authenticate a user with username and password.
@@ -222,6 +288,7 @@ class DatabaseManager:
             print(f"❌ Unexpected error during authentication: {exc}")
             return None
 
+    @_pooled
     def get_user_by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Get user by ID."""
         try:
@@ -258,6 +325,7 @@ class DatabaseManager:
             print(f"❌ Unexpected error during user fetch: {exc}")
             return None
 
+    @_pooled
     def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
         """Get user by username."""
         try:
@@ -294,6 +362,7 @@ class DatabaseManager:
             print(f"❌ Unexpected error during user fetch: {exc}")
             return None
 
+    @_pooled
     def list_users(self, role: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         List users, optionally filtered by role.
@@ -347,6 +416,7 @@ class DatabaseManager:
             print(f"❌ Unexpected error during users list: {exc}")
             return []
 
+    @_pooled
     def update_user(self, user_id: int, updates: Dict[str, Any]) -> bool:
         """
         Update user information.
@@ -423,6 +493,7 @@ class DatabaseManager:
             print(f"❌ Unexpected error during password update: {exc}")
             return False
 
+    @_pooled
     def update_last_login(self, user_id: int) -> bool:
         """Update user's last login timestamp."""
         try:
@@ -508,6 +579,7 @@ class DatabaseManager:
     # HOMEWORK/ASSIGNMENT MANAGEMENT METHODS
     # =============================================================================
 
+    @_pooled
     def create_assignment(self, assignment: Dict[str, Any]) -> Optional[str]:
         """
         Insert an assignment and its questions.
@@ -524,7 +596,7 @@ class DatabaseManager:
                     'context': str,
                     'type': 'text'|'image',
                     'image_extension': str?,
-                    'image_bytes': str?,    
+                    'image_bytes': bytes?,  # raw; a base64 str is also accepted
                 }
             ],
             'num_text_questions': int,
@@ -543,7 +615,7 @@ class DatabaseManager:
         cursor = None
 
         try:
-            created_at = datetime.now().strftime("%Y-%m-%d %H:%M")
+            created_at = datetime.now().replace(microsecond=0)
             name = assignment.get("name")
             collection_id = assignment.get("collection_id")
             teacher_id = assignment.get("teacher_id")
@@ -555,24 +627,47 @@ class DatabaseManager:
                 print("❌ teacher_id is required for assignment creation")
                 return None
             
+            num_questions = len(questions)
+            # Images, the assignment and its questions are committed together
+            if not mydb.in_transaction:
+                mydb.start_transaction()
+            cursor = mydb.cursor()
+
+            # One pass over the questions: upload images, build the rows and count types
+            question_rows = []
+            num_text_questions = 0
+            num_image_questions = 0
             for q in questions:
                 qtype = q.get("type")
+                if qtype == "text":
+                    num_text_questions += 1
+                elif qtype == "image":
+                    num_image_questions += 1
                 qtext = q.get("question")
                 ans = q.get("answer")
                 ctx = q.get("context")
-                if qtype == "image":
+                if isinstance(ctx, list):
+                    ctx = "\n".join(ctx)
+                
+                image_id = None
+                if qtype == "image" and q.get("image_bytes") and q.get("image_extension"):
+                    # Insert into the images table as part of this transaction
                     img_bytes = q.get("image_bytes")
-                    img_ext = q.get("image_extension")
-                else:
-                    img_bytes = None
-                    img_ext = None
-            num_questions = len(questions)
+                    if isinstance(img_bytes, str):
+                        img_bytes = base64.b64decode(img_bytes)
+                    image_id = self._insert_image(cursor, img_bytes, q["image_extension"])
 
-            num_text_questions = sum(1 for q in questions if q.get("type") == "text")
-            num_image_questions = sum(1 for q in questions if q.get("type") == "image")
+                question_rows.append(
+                    (
+                        qtype,
+                        qtext,
+                        ans,
+                        ctx,
+                        image_id,
+                        created_at,
+                    )
+                )
 
-            
-            cursor = mydb.cursor()
             insert_assignment_sql = (
                 "INSERT INTO assignments (name, collection_id, teacher_id, created_at, num_questions, num_text_questions, num_image_questions, status) "
                 "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"
@@ -598,35 +693,14 @@ class DatabaseManager:
                 "VALUES (%s, %s, %s, %s, %s, %s, %s)"
             )
 
-
-            for idx, q in enumerate(questions, start=1):
-                qtype = q.get("type")
-                qtext = q.get("question")
-                ans = q.get("answer")
-                ctx = q.get("context")
-                if isinstance(ctx, list):
-                    ctx = "\n".join(ctx)
-                
-                image_id = None
-                if qtype == "image" and q.get("image_bytes") and q.get("image_extension"):
-                    # Upload image to images table and get image_id
-                    img_bytes = base64.b64decode(q.get("image_bytes"))
-                    image_id = self.upload_image(img_bytes, q["image_extension"])
-
-                cursor.execute(
+            if question_rows:
+                cursor.executemany(
                     insert_question_sql,
-                    (
-                        assignment_id,
-                        qtype,
-                        qtext,
-                        ans,
-                        ctx,
-                        image_id,
-                        created_at,
-                    ),
+                    [(assignment_id,) + row for row in question_rows],
                 )
 
             mydb.commit()
+            self._assignments_changed()
             return assignment_id
         except Exception as exc:
             try:
@@ -643,23 +717,42 @@ class DatabaseManager:
             except Exception:
                 pass
 
-    def get_assignment(self, assignment_id: str, include_questions: bool = True, include_image_bytes: bool = False) -> Optional[Dict[str, Any]]:
-        """Fetch a single assignment by id. Optionally include its questions."""
+    @_pooled
+    def get_assignment(self, assignment_id: str, include_questions: bool = True, include_image_bytes: bool = False, image_format: str = "bytes") -> Optional[Dict[str, Any]]:
+        """Fetch a single assignment by id. Optionally include its questions; image_format picks how image_bytes is returned (see _format_image)."""
         try:
             mydb = self.get_connection()
             if not mydb:
                 print("❌ No database connection available")
                 return None
             cursor = mydb.cursor(dictionary=True)
-            cursor.execute(
-                "SELECT id, name, collection_id, teacher_id, created_at, num_questions, "
-                "num_text_questions, num_image_questions, status FROM assignments WHERE id = %s",
-                (assignment_id,),
-            )
-            row = cursor.fetchone()
-            if not row:
-                cursor.close()
+            if include_questions:
+                # One round trip: the assignment columns repeat on every question row.
+                # Image blobs are only joined in when the caller asked for them.
+                image_cols = ", i.image_data AS q_image_data, i.image_extension AS q_image_extension" if include_image_bytes else ""
+                image_join = " LEFT JOIN images i ON i.id = q.image_id" if include_image_bytes else ""
+                cursor.execute(
+                    "SELECT a.id, a.name, a.collection_id, a.teacher_id, a.created_at, a.num_questions, "
+                    "a.num_text_questions, a.num_image_questions, a.status, "
+                    "q.id AS q_id, q.assignment_id AS q_assignment_id, q.type AS q_type, q.question AS q_question, "
+                    "q.answer AS q_answer, q.context AS q_context, q.image_id AS q_image_id, q.created_at AS q_created_at"
+                    + image_cols
+                    + " FROM assignments a LEFT JOIN questions q ON q.assignment_id = a.id"
+                    + image_join
+                    + " WHERE a.id = %s ORDER BY q.id ASC",
+                    (assignment_id,),
+                )
+            else:
+                cursor.execute(
+                    "SELECT id, name, collection_id, teacher_id, created_at, num_questions, "
+                    "num_text_questions, num_image_questions, status FROM assignments WHERE id = %s",
+                    (assignment_id,),
+                )
+            rows = cursor.fetchall()
+            cursor.close()
+            if not rows:
                 return None
+            row = rows[0]
             assignment = {
                 "id": row["id"],
                 "name": row["name"],
@@ -673,42 +766,36 @@ class DatabaseManager:
             }
 
             if include_questions:
-                cursor.execute(
-                    "SELECT id, assignment_id, type, question, answer, context, image_id, created_at FROM questions WHERE assignment_id = %s ORDER BY id ASC",
-                    (assignment_id,),
-                )
-                qrows = cursor.fetchall()
                 questions: List[Dict[str, Any]] = []
-                for q in qrows:
-                    ctx = q.get("context")
+                for q in rows:
+                    if q["q_id"] is None:
+                        continue  # LEFT JOIN row for an assignment without questions
+                    ctx = q.get("q_context")
                     if ctx is not None and not isinstance(ctx, str):
                         ctx = str(ctx)
                     qdict: Dict[str, Any] = {
-                        "id": q["id"],
-                        "assignment_id": q["assignment_id"],
-                        "type": q["type"],
-                        "question": q["question"],
-                        "answer": q["answer"],
+                        "id": q["q_id"],
+                        "assignment_id": q["q_assignment_id"],
+                        "type": q["q_type"],
+                        "question": q["q_question"],
+                        "answer": q["q_answer"],
                         "context": ctx,
-                        "image_id": q.get("image_id"),
-                        "created_at": q["created_at"].isoformat() if q.get("created_at") else None,
+                        "image_id": q.get("q_image_id"),
+                        "created_at": q["q_created_at"].isoformat() if q.get("q_created_at") else None,
                     }
-                    if include_image_bytes and q.get("image_id") is not None:
-                        # Get image data from images table
-                        image_data = self.get_image_as_base64(q["image_id"])
-                        if image_data:
-                            qdict["image_bytes"] = image_data
+                    if include_image_bytes and q.get("q_image_data"):
+                        qdict["image_bytes"] = _format_image(q["q_image_data"], q.get("q_image_extension"), image_format)
                     questions.append(qdict)
                 assignment["questions"] = questions
 
-            cursor.close()
             return assignment
         except Exception as exc:
             print(f"❌ Unexpected error during assignment fetch: {exc}")
             return None
 
-    def list_assignments(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-        """List assignments ordered by created_at desc. Optionally limit the number of rows."""
+    @_pooled
+    def list_assignments(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """List one page of assignments ordered by created_at desc."""
         try:
             mydb = self.get_connection()
             if not mydb:
@@ -717,51 +804,88 @@ class DatabaseManager:
             cursor = mydb.cursor(dictionary=True)
             sql = (
                 "SELECT id, name, collection_id, teacher_id, created_at, num_questions, "
-                "num_text_questions, num_image_questions, status FROM assignments ORDER BY created_at DESC"
+                "num_text_questions, num_image_questions, status FROM assignments ORDER BY created_at DESC, id DESC"
             )
-            if limit and isinstance(limit, int) and limit > 0:
-                sql += " LIMIT %s"
-                cursor.execute(sql, (limit,))
-            else:
-                cursor.execute(sql)
-            rows = cursor.fetchall()
-            cursor.close()
+            cursor.execute(sql + " LIMIT %s OFFSET %s", (max(1, int(limit)), max(0, int(offset))))
             result: List[Dict[str, Any]] = []
-            for row in rows:
-                result.append(
-                    {
-                        "id": row["id"],
-                        "name": row["name"],
-                        "collection_id": row.get("collection_id"),
-                        "teacher_id": row.get("teacher_id"),
-                        "created_at": row["created_at"].isoformat() if row.get("created_at") else None,
-                        "num_questions": row["num_questions"],
-                        "num_text_questions": row["num_text_questions"],
-                        "num_image_questions": row["num_image_questions"],
-                        "status": row["status"],
-                    }
-                )
+            # Convert rows in batches rather than materialising the raw result set first
+            while True:
+                rows = cursor.fetchmany(500)
+                if not rows:
+                    break
+                for row in rows:
+                    result.append(
+                        {
+                            "id": row["id"],
+                            "name": row["name"],
+                            "collection_id": row.get("collection_id"),
+                            "teacher_id": row.get("teacher_id"),
+                            "created_at": row["created_at"].isoformat() if row.get("created_at") else None,
+                            "num_questions": row["num_questions"],
+                            "num_text_questions": row["num_text_questions"],
+                            "num_image_questions": row["num_image_questions"],
+                            "status": row["status"],
+                        }
+                    )
+            cursor.close()
             return result
         except Exception as exc:
             print(f"❌ Unexpected error during assignments list: {exc}")
             return []
 
-    def get_assignment_questions(self, assignment_id: str, include_image_bytes: bool = False) -> List[Dict[str, Any]]:
-        """Fetch questions for a specific assignment id, ordered by id."""
+    def list_assignments_cached(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Same as list_assignments(), but reuses the previous result until an
+        assignment is created, deleted or changes status (or the TTL runs out).
+        The returned list is shared between callers and must not be modified.
+        """
+        key = (self._assignments_version, limit, offset)
+        cached = self._assignments_cache.get(key)
+        if cached and time.monotonic() - cached[0] < self.ASSIGNMENTS_CACHE_TTL:
+            return cached[1]
+        result = self.list_assignments(limit, offset)
+        # list_assignments() returns [] on a database error too; don't let one
+        # failed query show "no assignments" for the whole TTL
+        if result:
+            self._assignments_cache[key] = (time.monotonic(), result)
+        return result
+
+    def _assignments_changed(self):
+        """Invalidate list_assignments_cached() after an assignment write."""
+        self._assignments_version += 1
+        self._assignments_cache = {}
+
+    def iter_assignment_questions(self, assignment_id: str, include_image_bytes: bool = False, image_format: str = "bytes") -> Iterator[Dict[str, Any]]:
+        """
+        Stream the questions for an assignment id, ordered by id. Rows are read
+        from the server one at a time, so image blobs are never all held in
+        memory at once. Consume the iterator fully; it holds the connection
+        until the last row.
+        """
+        cursor = None
+        mydb = self.get_connection()
+        owns_connection = mydb is None
+        if owns_connection:
+            # The unbuffered cursor keeps its connection busy until the last
+            # row, so a standalone caller gets a connection of its own
+            mydb = self._checkout_connection()
         try:
-            mydb = self.get_connection()
             if not mydb:
                 print("❌ No database connection available")
-                return []
-            cursor = mydb.cursor(dictionary=True)
+                return
+            cursor = mydb.cursor(dictionary=True, buffered=False)
+            # Image blobs are only joined in when the caller asked for them
+            image_cols = ", i.image_data, i.image_extension" if include_image_bytes else ""
+            image_join = " LEFT JOIN images i ON i.id = q.image_id" if include_image_bytes else ""
             cursor.execute(
-                "SELECT id, assignment_id, type, question, answer, context, image_id, created_at FROM questions WHERE assignment_id = %s ORDER BY id ASC",
+                "SELECT q.id, q.assignment_id, q.type, q.question, q.answer, q.context, q.image_id, q.created_at"
+                + image_cols
+                + " FROM questions q"
+                + image_join
+                + " WHERE q.assignment_id = %s ORDER BY q.id ASC",
                 (assignment_id,),
             )
-            qrows = cursor.fetchall()
-            cursor.close()
-            result: List[Dict[str, Any]] = []
-            for q in qrows:
+            for q in cursor:
                 ctx = q.get("context")
                 if ctx is not None and not isinstance(ctx, str):
                     ctx = str(ctx)
@@ -775,17 +899,29 @@ class DatabaseManager:
                     "image_id": q.get("image_id"),
                     "created_at": q["created_at"].isoformat() if q.get("created_at") else None,
                 }
-                if include_image_bytes and q.get("image_id") is not None:
-                    # Get image data from images table
-                    image_data = self.get_image_as_base64(q["image_id"])
-                    if image_data:
-                        item["image_bytes"] = image_data
-                result.append(item)
-            return result
+                if include_image_bytes and q.get("image_data"):
+                    item["image_bytes"] = _format_image(q["image_data"], q.get("image_extension"), image_format)
+                yield item
         except Exception as exc:
             print(f"❌ Unexpected error during questions fetch: {exc}")
-            return []
+        finally:
+            try:
+                if cursor:
+                    cursor.close()
+            except Exception:
+                pass
+            if owns_connection and mydb:
+                try:
+                    mydb.close()
+                except Exception:
+                    pass
 
+    @_pooled
+    def get_assignment_questions(self, assignment_id: str, include_image_bytes: bool = False, image_format: str = "bytes") -> List[Dict[str, Any]]:
+        """Fetch questions for a specific assignment id, ordered by id. image_format picks how image_bytes is returned (see _format_image)."""
+        return list(self.iter_assignment_questions(assignment_id, include_image_bytes, image_format))
+
+    @_pooled
     def delete_assignment(self, assignment_id: str) -> bool:
         """Delete an assignment by id. Questions are deleted via ON DELETE CASCADE."""
         try:
@@ -796,6 +932,7 @@ class DatabaseManager:
             cursor = mydb.cursor()
             cursor.execute("DELETE FROM assignments WHERE id = %s", (assignment_id,))
             mydb.commit()
+            self._assignments_changed()
             cursor.close()
             return True
         except Exception as exc:
@@ -807,6 +944,7 @@ class DatabaseManager:
             print(f"❌ Unexpected error during assignment delete: {exc}")
             return False
 
+    @_pooled
     def update_assignment_status(self, assignment_id: str, status: str) -> bool:
         """Update the status of an assignment to 'active' or 'archived'."""
         try:
@@ -820,6 +958,7 @@ class DatabaseManager:
             cursor = mydb.cursor()
             cursor.execute("UPDATE assignments SET status = %s WHERE id = %s", (status, assignment_id))
             mydb.commit()
+            self._assignments_changed()
             cursor.close()
             return True
         except Exception as exc:
@@ -831,6 +970,7 @@ class DatabaseManager:
             print(f"❌ Unexpected error during status update: {exc}")
             return False
 
+    @_pooled
     def get_assignments_by_teacher(self, teacher_id: int, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Get assignments created by a specific teacher."""
         try:
@@ -876,6 +1016,7 @@ class DatabaseManager:
     # SUBMISSION MANAGEMENT METHODS
     # =============================================================================
 
+    @_pooled
     def get_completed_submission(self, student_id: int, assignment_id: int):
         """Return the completed submission for a student/assignment if it exists."""
         try:
@@ -896,6 +1037,7 @@ class DatabaseManager:
             print(f"❌ Unexpected error during completed submission fetch: {exc}")
             return None
 
+    @_pooled
     def get_active_submission(self, student_id: int, assignment_id: int):
         """Return the active (in-progress) submission for a student/assignment if it exists."""
         try:
@@ -916,6 +1058,7 @@ class DatabaseManager:
             print(f"❌ Unexpected error during active submission fetch: {exc}")
             return None
 
+    @_pooled
     def get_all_submissions_for_assignment(self, assignment_id: int):
         """Get all submissions (completed and in-progress) for a specific assignment."""
         try:
@@ -940,6 +1083,7 @@ class DatabaseManager:
             print(f"❌ Unexpected error during submissions fetch: {exc}")
             return []
 
+    @_pooled
     def get_or_create_active_submission(self, student_id: int, assignment_id: int):
         """Return the in-progress submission for a student/assignment, or create one."""
         try:
@@ -980,6 +1124,7 @@ class DatabaseManager:
             print(f"❌ Unexpected error during submission create: {exc}")
             return None
 
+    @_pooled
     def get_submission(self, submission_id: int):
         """Fetch a submission and its answers grouped by question."""
         try:
@@ -1017,6 +1162,7 @@ class DatabaseManager:
             print(f"❌ Unexpected error during submission fetch: {exc}")
             return None
 
+    @_pooled
     def get_submission_answers(self, submission_id: int):
         """Return a dict question_id -> list of attempts for a submission."""
         try:
@@ -1041,6 +1187,7 @@ class DatabaseManager:
             print(f"❌ Unexpected error during submission answers fetch: {exc}")
             return {}
 
+    @_pooled
     def record_answer_attempt(
         self,
         submission_id: int,
@@ -1082,6 +1229,7 @@ class DatabaseManager:
             print(f"❌ Unexpected error during answer insert: {exc}")
             return False
 
+    @_pooled
     def mark_submission_completed(self, submission_id: int, overall_score: float, summary: str) -> bool:
         """Mark a submission as completed with overall score and summary."""
         try:
@@ -1106,6 +1254,7 @@ class DatabaseManager:
             print(f"❌ Unexpected error during submission completion: {exc}")
             return False
 
+    @_pooled
     def update_student_feedback(self, submission_id: int, student_feedback: str) -> bool:
         """Update student feedback for a completed submission."""
         try:
@@ -1130,6 +1279,7 @@ class DatabaseManager:
             print(f"❌ Unexpected error during student feedback update: {exc}")
             return False
 
+    @_pooled
     def get_submissions_by_student(self, student_id: int, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Get submissions by a specific student."""
         try:
@@ -1177,6 +1327,7 @@ class DatabaseManager:
     # RAG QUIZZER MANAGEMENT METHODS
     # =============================================================================
 
+    @_pooled
     def create_rag_quizzer(self, quizzer_data):
         """
         Create a new RAG quizzer entry.
@@ -1240,17 +1391,20 @@ class DatabaseManager:
                         "INSERT INTO rag_quizzer_slides (rag_quizzer_id, slide_number, slide_content, created_at) "
                         "VALUES (%s, %s, %s, %s)"
                     )
+                    created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    slide_rows = []
                     for slide in quizzer_data['slides']:
                         slide_content = json.dumps(slide) if isinstance(slide, dict) else str(slide)
-                        cursor.execute(
-                            slide_insert_sql,
+                        slide_rows.append(
                             (
                                 quizzer_id,
                                 slide.get('slide_number', 0),
                                 slide_content,
-                                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                            ),
+                                created_at,
+                            )
                         )
+                    # Sent as one multi-row INSERT
+                    cursor.executemany(slide_insert_sql, slide_rows)
 
                 mydb.commit()
                 print(f"✅ RAG Quizzer created successfully with ID: {quizzer_id}")
@@ -1275,6 +1429,7 @@ class DatabaseManager:
             print(f"❌ Error creating RAG quizzer: {e}")
             return None
 
+    @_pooled
     def get_rag_quizzers_by_teacher(self, teacher_id: int):
         """Get all RAG quizzers for a specific teacher."""
         try:
@@ -1315,6 +1470,7 @@ class DatabaseManager:
             print(f"❌ Error getting RAG quizzers by teacher: {e}")
             return []
 
+    @_pooled
     def delete_rag_quizzer(self, quizzer_id: int):
         """Soft delete a RAG quizzer by setting status to 'archived'."""
         try:
@@ -1347,6 +1503,18 @@ class DatabaseManager:
     # IMAGE MANAGEMENT METHODS
     # =============================================================================
 
+    def _insert_image(self, cursor, image_bytes, image_extension=None, content_type=None):
+        """
+        Inserts an image row with the given cursor without committing, so it
+        can be part of a larger transaction
+        returns: image_id
+        """
+        sql = "INSERT INTO images (image_data, image_extension, created_at, file_size, content_type) VALUES (%s, %s, %s, %s, %s)"
+        val = (image_bytes, image_extension, datetime.now().replace(microsecond=0), len(image_bytes), content_type)
+        cursor.execute(sql, val)
+        return cursor.lastrowid
+
+    @_pooled
     def upload_image(self, image_bytes, image_extension=None, content_type=None):
         """
         Uploads an image to the database and returns the image id
@@ -1361,21 +1529,16 @@ class DatabaseManager:
                 print("❌ No database connection available")
                 return None
                 
-            file_size = len(image_bytes)
-            created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
             mycursor = mydb.cursor()
-            sql = "INSERT INTO images (image_data, image_extension, created_at, file_size, content_type) VALUES (%s, %s, %s, %s, %s)"
-            val = (image_bytes, image_extension, created_at, file_size, content_type)
-            mycursor.execute(sql, val)
+            image_id = self._insert_image(mycursor, image_bytes, image_extension, content_type)
             mydb.commit()
-            image_id = mycursor.lastrowid
             mycursor.close()
             return image_id
         except Exception as e:
             print(f"❌ Unexpected error during image upload: {e}")
             return None
             
+    @_pooled
     def get_image(self, image_id):
         """
         Gets an image from the database and returns the image data and metadata
@@ -1414,6 +1577,7 @@ class DatabaseManager:
             print(f"❌ Unexpected error during image base64 conversion: {e}")
             return None
 
+    @_pooled
     def delete_image(self, image_id):
         """
         Deletes an image from the database
@@ -2,14 +2,49 @@ import os
 import hashlib
 import secrets
 import uuid
-import base64
+try:
+    import pybase64 as base64  # SIMD-accelerated drop-in for the stdlib module
+except ImportError:
+    import base64
 import json
+import time
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from dotenv import load_dotenv
 import psycopg
 from psycopg.rows import dict_row
 
+load_dotenv()
+
+# Connection settings, read from the environment once at import rather than on
+# every (re)connect
+POSTGRES_CONFIG = {
+    "host": os.getenv("POSTGRES_HOST", "dhost"),
+    "user": os.getenv("POSTGRES_USER", "postgres"),
+    "password": os.getenv("POSTGRES_PASSWORD", "[YOUR-PASSWORD]"),
+    "port": int(os.getenv("POSTGRES_PORT", "5432")),
+    "dbname": os.getenv("POSTGRES_DB", "postgres"),
+}
+
+
+def _format_image(image_data, image_extension, image_format):
+    """
+    Returns image bytes from the images table as raw bytes ("bytes"), base64
+    text ("base64") or a data URI ("data_uri"). Only the last two pay for encoding.
+    """
+    image_data = bytes(image_data)
+    if image_format == "bytes":
+        return image_data
+    encoded = base64.b64encode(image_data).decode("ascii")
+    if image_format == "base64":
+        return encoded
+    if image_format == "data_uri":
+        subtype = (image_extension or "png").lower().lstrip(".")
+        if subtype == "jpg":
+            subtype = "jpeg"
+        return f"data:image/{subtype};base64,{encoded}"
+    raise ValueError(f"Unknown image_format: {image_format}")
+
 
 class DatabaseManagerPSQL:
     """
@@ -22,6 +57,10 @@ class DatabaseManagerPSQL:
     _mydb = None
     _initialized = False
 
+    # Seconds list_assignments_cached() reuses a result without a local write,
+    # so changes made by other processes still show up
+    ASSIGNMENTS_CACHE_TTL = 60
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(DatabaseManagerPSQL, cls).__new__(cls)
@@ -30,25 +69,14 @@ class DatabaseManagerPSQL:
     def __init__(self):
         if not self._initialized:
             self._mydb = self._configure_database()
+            self._assignments_version = 0
+            self._assignments_cache = {}
             self._initialized = True
 
     def _configure_database(self):
         """Configure and return a PostgreSQL database connection."""
-        load_dotenv()
-        host = os.getenv("POSTGRES_HOST", "dhost")
-        user = os.getenv("POSTGRES_USER", "postgres")
-        password = os.getenv("POSTGRES_PASSWORD", "[YOUR-PASSWORD]")
-        port = int(os.getenv("POSTGRES_PORT", "5432"))
-        database = os.getenv("POSTGRES_DB", "postgres")
-
         try:
-            mydb = psycopg.connect(
-                host=host,
-                user=user,
-                password=password,
-                port=port,
-                dbname=database,
-            )
+            mydb = psycopg.connect(**POSTGRES_CONFIG)
             print("✅ PostgreSQL database connection established successfully")
             return mydb
         except Exception as exc:
@@ -543,7 +571,7 @@ class DatabaseManagerPSQL:
                     'context': str,
                     'type': 'text'|'image',
                     'image_extension': str?,
-                    'image_bytes': str?,    
+                    'image_bytes': bytes?,  # raw; a base64 str is also accepted
                 }
             ],
             'num_text_questions': int,
@@ -574,24 +602,45 @@ class DatabaseManagerPSQL:
                 print("❌ teacher_id is required for assignment creation")
                 return None
             
+            num_questions = len(questions)
+            # Images, the assignment and its questions are committed together
+            cursor = mydb.cursor()
+
+            # One pass over the questions: upload images, build the rows and count types
+            question_rows = []
+            num_text_questions = 0
+            num_image_questions = 0
             for q in questions:
                 qtype = q.get("type")
+                if qtype == "text":
+                    num_text_questions += 1
+                elif qtype == "image":
+                    num_image_questions += 1
                 qtext = q.get("question")
                 ans = q.get("answer")
                 ctx = q.get("context")
-                if qtype == "image":
+                if isinstance(ctx, list):
+                    ctx = "\n".join(ctx)
+                
+                image_id = None
+                if qtype == "image" and q.get("image_bytes") and q.get("image_extension"):
+                    # Insert into the images table as part of this transaction
                     img_bytes = q.get("image_bytes")
-                    img_ext = q.get("image_extension")
-                else:
-                    img_bytes = None
-                    img_ext = None
-            num_questions = len(questions)
+                    if isinstance(img_bytes, str):
+                        img_bytes = base64.b64decode(img_bytes)
+                    image_id = self._insert_image(cursor, img_bytes, q["image_extension"])
 
-            num_text_questions = sum(1 for q in questions if q.get("type") == "text")
-            num_image_questions = sum(1 for q in questions if q.get("type") == "image")
+                question_rows.append(
+                    (
+                        qtype,
+                        qtext,
+                        ans,
+                        ctx,
+                        image_id,
+                        created_at,
+                    )
+                )
 
-            
-            cursor = mydb.cursor()
             insert_assignment_sql = (
                 "INSERT INTO assignments (name, collection_id, teacher_id, created_at, num_questions, num_text_questions, num_image_questions, status) "
                 "VALUES (%s, %s, %s, %s, %s, %s, %s, %s) RETURNING id"
@@ -617,35 +666,14 @@ class DatabaseManagerPSQL:
                 "VALUES (%s, %s, %s, %s, %s, %s, %s)"
             )
 
-
-            for idx, q in enumerate(questions, start=1):
-                qtype = q.get("type")
-                qtext = q.get("question")
-                ans = q.get("answer")
-                ctx = q.get("context")
-                if isinstance(ctx, list):
-                    ctx = "\n".join(ctx)
-                
-                image_id = None
-                if qtype == "image" and q.get("image_bytes") and q.get("image_extension"):
-                    # Upload image to images table and get image_id
-                    img_bytes = base64.b64decode(q.get("image_bytes"))
-                    image_id = self.upload_image(img_bytes, q["image_extension"])
-
-                cursor.execute(
+            if question_rows:
+                cursor.executemany(
                     insert_question_sql,
-                    (
-                        assignment_id,
-                        qtype,
-                        qtext,
-                        ans,
-                        ctx,
-                        image_id,
-                        created_at,
-                    ),
+                    [(assignment_id,) + row for row in question_rows],
                 )
 
             mydb.commit()
+            self._assignments_changed()
             return assignment_id
         except Exception as exc:
             try:
@@ -662,23 +690,41 @@ class DatabaseManagerPSQL:
             except Exception:
                 pass
 
-    def get_assignment(self, assignment_id: str, include_questions: bool = True, include_image_bytes: bool = False) -> Optional[Dict[str, Any]]:
-        """Fetch a single assignment by id. Optionally include its questions."""
+    def get_assignment(self, assignment_id: str, include_questions: bool = True, include_image_bytes: bool = False, image_format: str = "bytes") -> Optional[Dict[str, Any]]:
+        """Fetch a single assignment by id. Optionally include its questions; image_format picks how image_bytes is returned (see _format_image)."""
         try:
             mydb = self.get_connection()
             if not mydb:
                 print("❌ No PostgreSQL database connection available")
                 return None
             cursor = mydb.cursor(row_factory=dict_row)
-            cursor.execute(
-                "SELECT id, name, collection_id, teacher_id, created_at, num_questions, "
-                "num_text_questions, num_image_questions, status FROM assignments WHERE id = %s",
-                (assignment_id,),
-            )
-            row = cursor.fetchone()
-            if not row:
-                cursor.close()
+            if include_questions:
+                # One round trip: the assignment columns repeat on every question row.
+                # Image blobs are only joined in when the caller asked for them.
+                image_cols = ", i.image_data AS q_image_data, i.image_extension AS q_image_extension" if include_image_bytes else ""
+                image_join = " LEFT JOIN images i ON i.id = q.image_id" if include_image_bytes else ""
+                cursor.execute(
+                    "SELECT a.id, a.name, a.collection_id, a.teacher_id, a.created_at, a.num_questions, "
+                    "a.num_text_questions, a.num_image_questions, a.status, "
+                    "q.id AS q_id, q.assignment_id AS q_assignment_id, q.type AS q_type, q.question AS q_question, "
+                    "q.answer AS q_answer, q.context AS q_context, q.image_id AS q_image_id, q.created_at AS q_created_at"
+                    + image_cols
+                    + " FROM assignments a LEFT JOIN questions q ON q.assignment_id = a.id"
+                    + image_join
+                    + " WHERE a.id = %s ORDER BY q.id ASC",
+                    (assignment_id,),
+                )
+            else:
+                cursor.execute(
+                    "SELECT id, name, collection_id, teacher_id, created_at, num_questions, "
+                    "num_text_questions, num_image_questions, status FROM assignments WHERE id = %s",
+                    (assignment_id,),
+                )
+            rows = cursor.fetchall()
+            cursor.close()
+            if not rows:
                 return None
+            row = rows[0]
             assignment = {
                 "id": row["id"],
                 "name": row["name"],
@@ -692,42 +738,35 @@ class DatabaseManagerPSQL:
             }
 
             if include_questions:
-                cursor.execute(
-                    "SELECT id, assignment_id, type, question, answer, context, image_id, created_at FROM questions WHERE assignment_id = %s ORDER BY id ASC",
-                    (assignment_id,),
-                )
-                qrows = cursor.fetchall()
                 questions: List[Dict[str, Any]] = []
-                for q in qrows:
-                    ctx = q.get("context")
+                for q in rows:
+                    if q["q_id"] is None:
+                        continue  # LEFT JOIN row for an assignment without questions
+                    ctx = q.get("q_context")
                     if ctx is not None and not isinstance(ctx, str):
                         ctx = str(ctx)
                     qdict: Dict[str, Any] = {
-                        "id": q["id"],
-                        "assignment_id": q["assignment_id"],
-                        "type": q["type"],
-                        "question": q["question"],
-                        "answer": q["answer"],
+                        "id": q["q_id"],
+                        "assignment_id": q["q_assignment_id"],
+                        "type": q["q_type"],
+                        "question": q["q_question"],
+                        "answer": q["q_answer"],
                         "context": ctx,
-                        "image_id": q.get("image_id"),
-                        "created_at": q["created_at"].isoformat() if q.get("created_at") else None,
+                        "image_id": q.get("q_image_id"),
+                        "created_at": q["q_created_at"].isoformat() if q.get("q_created_at") else None,
                     }
-                    if include_image_bytes and q.get("image_id") is not None:
-                        # Get image data from images table
-                        image_data = self.get_image_as_base64(q["image_id"])
-                        if image_data:
-                            qdict["image_bytes"] = image_data
+                    if include_image_bytes and q.get("q_image_data"):
+                        qdict["image_bytes"] = _format_image(q["q_image_data"], q.get("q_image_extension"), image_format)
                     questions.append(qdict)
                 assignment["questions"] = questions
 
-            cursor.close()
             return assignment
         except Exception as exc:
             print(f"❌ Unexpected error during assignment fetch: {exc}")
             return None
 
-    def list_assignments(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-        """List assignments ordered by created_at desc. Optionally limit the number of rows."""
+    def list_assignments(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """List one page of assignments ordered by created_at desc."""
         try:
             mydb = self.get_connection()
             if not mydb:
@@ -736,51 +775,86 @@ class DatabaseManagerPSQL:
             cursor = mydb.cursor(row_factory=dict_row)
             sql = (
                 "SELECT id, name, collection_id, teacher_id, created_at, num_questions, "
-                "num_text_questions, num_image_questions, status FROM assignments ORDER BY created_at DESC"
+                "num_text_questions, num_image_questions, status FROM assignments ORDER BY created_at DESC, id DESC"
             )
-            if limit and isinstance(limit, int) and limit > 0:
-                sql += " LIMIT %s"
-                cursor.execute(sql, (limit,))
-            else:
-                cursor.execute(sql)
-            rows = cursor.fetchall()
-            cursor.close()
+            cursor.execute(sql + " LIMIT %s OFFSET %s", (max(1, int(limit)), max(0, int(offset))))
             result: List[Dict[str, Any]] = []
-            for row in rows:
-                result.append(
-                    {
-                        "id": row["id"],
-                        "name": row["name"],
-                        "collection_id": row.get("collection_id"),
-                        "teacher_id": row.get("teacher_id"),
-                        "created_at": row["created_at"].isoformat() if row.get("created_at") else None,
-                        "num_questions": row["num_questions"],
-                        "num_text_questions": row["num_text_questions"],
-                        "num_image_questions": row["num_image_questions"],
-                        "status": row["status"],
-                    }
-                )
+            # Convert rows in batches rather than materialising the raw result set first
+            while True:
+                rows = cursor.fetchmany(500)
+                if not rows:
+                    break
+                for row in rows:
+                    result.append(
+                        {
+                            "id": row["id"],
+                            "name": row["name"],
+                            "collection_id": row.get("collection_id"),
+                            "teacher_id": row.get("teacher_id"),
+                            "created_at": row["created_at"].isoformat() if row.get("created_at") else None,
+                            "num_questions": row["num_questions"],
+                            "num_text_questions": row["num_text_questions"],
+                            "num_image_questions": row["num_image_questions"],
+                            "status": row["status"],
+                        }
+                    )
+            cursor.close()
             return result
         except Exception as exc:
             print(f"❌ Unexpected error during assignments list: {exc}")
             return []
 
-    def get_assignment_questions(self, assignment_id: str, include_image_bytes: bool = False) -> List[Dict[str, Any]]:
-        """Fetch questions for a specific assignment id, ordered by id."""
+    def list_assignments_cached(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Same as list_assignments(), but reuses the previous result until an
+        assignment is created, deleted or changes status (or the TTL runs out).
+        The returned list is shared between callers and must not be modified.
+        """
+        key = (self._assignments_version, limit, offset)
+        cached = self._assignments_cache.get(key)
+        if cached and time.monotonic() - cached[0] < self.ASSIGNMENTS_CACHE_TTL:
+            return cached[1]
+        result = self.list_assignments(limit, offset)
+        # list_assignments() returns [] on a database error too; don't let one
+        # failed query show "no assignments" for the whole TTL
+        if result:
+            self._assignments_cache[key] = (time.monotonic(), result)
+        return result
+
+    def _assignments_changed(self):
+        """Invalidate list_assignments_cached() after an assignment write."""
+        self._assignments_version += 1
+        self._assignments_cache = {}
+
+    def iter_assignment_questions(self, assignment_id: str, include_image_bytes: bool = False, image_format: str = "bytes") -> Iterator[Dict[str, Any]]:
+        """
+        Iterate the questions for an assignment id, ordered by id. This is not
+        streamed: the client-side cursor fetches every row, image blobs
+        included, in one round trip when the query runs. The shared connection
+        is free again as soon as it returns; rows are then turned into
+        question dicts one at a time as the caller consumes them.
+        """
+        cursor = None
         try:
             mydb = self.get_connection()
             if not mydb:
                 print("❌ No PostgreSQL database connection available")
-                return []
+                return
             cursor = mydb.cursor(row_factory=dict_row)
+            # Image blobs are only joined in when the caller asked for them
+            image_cols = ", i.image_data, i.image_extension" if include_image_bytes else ""
+            image_join = " LEFT JOIN images i ON i.id = q.image_id" if include_image_bytes else ""
             cursor.execute(
-                "SELECT id, assignment_id, type, question, answer, context, image_id, created_at FROM questions WHERE assignment_id = %s ORDER BY id ASC",
+                "SELECT q.id, q.assignment_id, q.type, q.question, q.answer, q.context, q.image_id, q.created_at"
+                + image_cols
+                + " FROM questions q"
+                + image_join
+                + " WHERE q.assignment_id = %s ORDER BY q.id ASC",
                 (assignment_id,),
             )
-            qrows = cursor.fetchall()
-            cursor.close()
-            result: List[Dict[str, Any]] = []
-            for q in qrows:
+            # Client-side cursor: the rows are already here, so iterating it
+            # does not hold the connection (or its lock) between yields
+            for q in cursor:
                 ctx = q.get("context")
                 if ctx is not None and not isinstance(ctx, str):
                     ctx = str(ctx)
@@ -794,16 +868,21 @@ class DatabaseManagerPSQL:
                     "image_id": q.get("image_id"),
                     "created_at": q["created_at"].isoformat() if q.get("created_at") else None,
                 }
-                if include_image_bytes and q.get("image_id") is not None:
-                    # Get image data from images table
-                    image_data = self.get_image_as_base64(q["image_id"])
-                    if image_data:
-                        item["image_bytes"] = image_data
-                result.append(item)
-            return result
+                if include_image_bytes and q.get("image_data"):
+                    item["image_bytes"] = _format_image(q["image_data"], q.get("image_extension"), image_format)
+                yield item
         except Exception as exc:
             print(f"❌ Unexpected error during questions fetch: {exc}")
-            return []
+        finally:
+            try:
+                if cursor:
+                    cursor.close()
+            except Exception:
+                pass
+
+    def get_assignment_questions(self, assignment_id: str, include_image_bytes: bool = False, image_format: str = "bytes") -> List[Dict[str, Any]]:
+        """Fetch questions for a specific assignment id, ordered by id. image_format picks how image_bytes is returned (see _format_image)."""
+        return list(self.iter_assignment_questions(assignment_id, include_image_bytes, image_format))
 
     def delete_assignment(self, assignment_id: str) -> bool:
         """Delete an assignment by id. Questions are deleted via ON DELETE CASCADE."""
@@ -815,6 +894,7 @@ class DatabaseManagerPSQL:
             cursor = mydb.cursor()
             cursor.execute("DELETE FROM assignments WHERE id = %s", (assignment_id,))
             mydb.commit()
+            self._assignments_changed()
             cursor.close()
             return True
         except Exception as exc:
@@ -839,6 +919,7 @@ class DatabaseManagerPSQL:
             cursor = mydb.cursor()
             cursor.execute("UPDATE assignments SET status = %s WHERE id = %s", (status, assignment_id))
             mydb.commit()
+            self._assignments_changed()
             cursor.close()
             return True
         except Exception as exc:
@@ -1264,17 +1345,19 @@ class DatabaseManagerPSQL:
                         "INSERT INTO rag_quizzer_slides (rag_quizzer_id, slide_number, slide_content, created_at) "
                         "VALUES (%s, %s, %s, %s)"
                     )
+                    created_at = datetime.now()
+                    slide_rows = []
                     for slide in quizzer_data['slides']:
                         slide_content = json.dumps(slide) if isinstance(slide, dict) else str(slide)
-                        cursor.execute(
-                            slide_insert_sql,
+                        slide_rows.append(
                             (
                                 quizzer_id,
                                 slide.get('slide_number', 0),
                                 slide_content,
-                                datetime.now(),
-                            ),
+                                created_at,
+                            )
                         )
+                    cursor.executemany(slide_insert_sql, slide_rows)
 
                 mydb.commit()
                 print(f"✅ RAG Quizzer created successfully with ID: {quizzer_id}")
@@ -1371,6 +1454,17 @@ class DatabaseManagerPSQL:
     # IMAGE MANAGEMENT METHODS
     # =============================================================================
 
+    def _insert_image(self, cursor, image_bytes, image_extension=None, content_type=None):
+        """
+        Inserts an image row with the given cursor without committing, so it
+        can be part of a larger transaction
+        returns: image_id
+        """
+        sql = "INSERT INTO images (image_data, image_extension, created_at, file_size, content_type) VALUES (%s, %s, %s, %s, %s) RETURNING id"
+        val = (image_bytes, image_extension, datetime.now(), len(image_bytes), content_type)
+        cursor.execute(sql, val)
+        return cursor.fetchone()[0]
+
     def upload_image(self, image_bytes, image_extension=None, content_type=None):
         """
         Uploads an image to the database and returns the image id
@@ -1385,15 +1479,9 @@ class DatabaseManagerPSQL:
                 print("❌ No PostgreSQL database connection available")
                 return None
                 
-            file_size = len(image_bytes)
-            created_at = datetime.now()
-            
             mycursor = mydb.cursor()
-            sql = "INSERT INTO images (image_data, image_extension, created_at, file_size, content_type) VALUES (%s, %s, %s, %s, %s) RETURNING id"
-            val = (image_bytes, image_extension, created_at, file_size, content_type)
-            mycursor.execute(sql, val)
+            image_id = self._insert_image(mycursor, image_bytes, image_extension, content_type)
             mydb.commit()
-            image_id = mycursor.fetchone()[0]
             mycursor.close()
             return image_id
         except Exception as e:
@@ -73,6 +73,9 @@ CREATE TABLE questions (
   FOREIGN KEY (image_id) REFERENCES images(id) ON DELETE SET NULL ON UPDATE CASCADE
 );
 
+-- Questions are always read per assignment in id order
+CREATE INDEX ix_questions_assignment_id_id ON questions (assignment_id, id);
+
 -- Update submissions table to include student_id foreign key
 CREATE TABLE submissions (
     id INT PRIMARY KEY AUTO_INCREMENT,
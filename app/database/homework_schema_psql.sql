@@ -69,6 +69,9 @@ CREATE TABLE questions (
     created_at TIMESTAMP NOT NULL
 );
 
+-- Questions are always read per assignment in id order
+CREATE INDEX ix_questions_assignment_id_id ON questions (assignment_id, id);
+
 -- Submissions table
 CREATE TABLE submissions (
     id SERIAL PRIMARY KEY,
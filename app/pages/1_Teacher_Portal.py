@@ -1,6 +1,9 @@
 import streamlit as st
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import io
 import json
+import logging
 import pandas as pd
 from datetime import datetime
 import sys
@@ -8,6 +11,8 @@ import os
 from PIL import Image
 from models import RAG_quizzer
 import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
 # Add the current directory to the path to import our modules
 sys.path.append(os.path.dirname(__file__))
 
@@ -43,32 +48,193 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Debug logging is off by default (root level is WARNING); enable the
+# "teacher_dashboard" logger at DEBUG to trace assignment operations
+log = logging.getLogger("teacher_dashboard")
+
 ss = st.session_state
 
 # Initialize session state
-if 'rag_core' not in ss:
-    ss.rag_core = None
+# Servers open database connections, so they are only built when missing
 if 'homework_server' not in ss:
     ss.homework_server = HomeworkServer()
 if 'image_server' not in ss:
     ss.image_server = ImageServer()
-if 'image_magic' not in ss:
-    ss.image_magic = None
 if 'user_server' not in ss:
     ss.user_server = UserServer()
 
-if 'current_user' not in ss:
-    ss.current_user = None
-if 'app_stage' not in ss:
-    ss.app_stage = 'dashboard'
-if 'rag_quizzer_list' not in ss:
-    ss.rag_quizzer_list = []
-if 'homework_assignments' not in ss:
-    ss.homework_assignments = []
-if 'homework_preview' not in ss:
-    ss.homework_preview = None
-if 'selected_assignment_for_results' not in ss:
-    ss.selected_assignment_for_results = None
+for key, default in {
+    'rag_core': None,
+    'image_magic': None,
+    'current_user': None,
+    'app_stage': 'dashboard',
+    'homework_preview': None,
+    'image_ids': {},  # image item id -> database image id for the presentation being edited
+    'selected_assignment_for_results': None,
+}.items():
+    ss.setdefault(key, default)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_assignments(teacher_id):
+    """A teacher's assignments, cached between reruns.
+
+    get_assignments_by_teacher() returns [] on a database error as well as
+    when there are none, so an empty result raises instead: st.cache_data
+    doesn't keep exceptions, and a failed query isn't served for the TTL.
+    """
+    assignments = HomeworkServer().get_assignments_by_teacher(teacher_id)
+    if not assignments:
+        raise LookupError(f"no assignments loaded for teacher {teacher_id}")
+    return assignments
+
+
+def _load_assignments(teacher_id):
+    """Load a teacher's assignments.
+
+    Cached so reruns (expander toggles, button clicks) don't hit the database;
+    call ``_cached_assignments.clear()`` after creating or deleting an assignment.
+    """
+    try:
+        return _cached_assignments(teacher_id)
+    except LookupError:
+        return []
+
+
+# Images are displayed at most this wide, so larger ones are downscaled before sending
+THUMBNAIL_SIZE = (1000, 1000)
+
+
+def _make_thumbnail(image_bytes):
+    """Downscale image bytes to THUMBNAIL_SIZE, re-encoding as JPEG (PNG if transparent)."""
+    img = Image.open(io.BytesIO(image_bytes))
+    img.thumbnail(THUMBNAIL_SIZE)
+    with io.BytesIO() as buf:
+        if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+            img.save(buf, format="PNG", optimize=True)
+        else:
+            img.convert("RGB").save(buf, format="JPEG", quality=82)
+        return buf.getvalue()
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _thumbnail(_image_bytes, image_key):
+    """Thumbnail for a slide image, cached by its id (the bytes aren't hashed)."""
+    return _make_thumbnail(_image_bytes)
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _question_thumbnail(image_bytes):
+    """Thumbnail for a question image, made once instead of on every rerun."""
+    return _make_thumbnail(image_bytes)
+
+
+@st.cache_resource
+def _presentation_registry():
+    """Server-side store of in-progress presentations, keyed by presentation id.
+
+    Session state only holds the id, so the parsed presentation (with all its
+    image bytes) isn't carried through session state on every rerun. Each
+    entry remembers the session that owns it; a session holds at most its
+    current presentation and one parsed upload, and its entries are dropped
+    once the session has ended (e.g. the teacher closed the tab), never
+    while it is still live. Use the helpers below rather than the dict.
+    """
+    return {}, threading.Lock()  # id -> (owning session id, presentation)
+
+
+def _session_id():
+    """Id of the Streamlit session running this script, or None outside one."""
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else None
+
+
+def _prune_presentations(registry):
+    """Drop entries of sessions that have ended; the caller holds the registry lock."""
+    if not Runtime.exists():
+        return
+    runtime = Runtime.instance()
+    for presentation_id, (session_id, _) in list(registry.items()):
+        if session_id is not None and not runtime.is_active_session(session_id):
+            del registry[presentation_id]
+
+
+def _get_presentation(presentation_id):
+    """A registered presentation by id, or None."""
+    registry, lock = _presentation_registry()
+    with lock:
+        entry = registry.get(presentation_id)
+        return entry[1] if entry else None
+
+
+def _store_presentation(presentation):
+    """Register a presentation under its id, owned by the current session."""
+    registry, lock = _presentation_registry()
+    with lock:
+        _prune_presentations(registry)
+        registry[presentation.id] = (_session_id(), presentation)
+
+
+def _drop_presentation(presentation_id):
+    """Remove a presentation from the registry, if present."""
+    registry, lock = _presentation_registry()
+    with lock:
+        registry.pop(presentation_id, None)
+
+
+def _current_presentation():
+    """The presentation being edited in this session, or None if there isn't one."""
+    return _get_presentation(ss.get('presentation_id'))
+
+
+@st.cache_resource
+def _background_executor():
+    """Shared worker pool for slow jobs that can run while the teacher works in the UI."""
+    return ThreadPoolExecutor(max_workers=2)
+
+
+@st.cache_resource
+def _request_executor():
+    """Shared worker pool for Gemini calls fanned out while a page is rendering.
+
+    Reused across reruns and sessions instead of starting new threads on
+    every click; the total number of concurrent model calls stays bounded.
+    """
+    return ThreadPoolExecutor(max_workers=8)
+
+
+def _start_background_embedding(presentation):
+    """Start building the final RAG collection while the teacher names the quizzer.
+
+    The job is tagged with the presentation's content hash so process_quiz_rag
+    only uses it if nothing was edited in the meantime.
+    """
+    _discard_background_embedding(ss.pop('embed_job', None))
+    content_hash = presentation.content_hash()
+    if ss.rag_core.get_collection_hash(ss.collection_id) == content_hash:
+        return  # The existing collection is already up to date
+    # Images are stored here, once, so a discarded build leaves no image rows behind
+    ss.rag_core.upload_images(presentation, ss.image_ids)
+    future = _background_executor().submit(
+        ss.rag_core.create_collection, presentation, dict(ss.image_ids)
+    )
+    ss.embed_job = (content_hash, future)
+
+
+def _discard_background_embedding(job):
+    """Drop a pending embedding job, removing its collection once built."""
+    if job is None:
+        return
+    rag_core = ss.rag_core
+
+    def remove_collection(future):
+        if future.exception() is None:
+            try:
+                rag_core.remove_collection(future.result())
+            except Exception:
+                pass
+
+    job[1].add_done_callback(remove_collection)
 
 
 def initialize_services():
@@ -110,9 +276,21 @@ def upload_and_process_pptx():
     if uploaded_file is not None:
         
         with st.spinner("Processing PowerPoint file..."):
-            file_bytes = uploaded_file.read()
-            file_object = io.BytesIO(file_bytes)
-            presentation = parse_powerpoint(file_object, uploaded_file.name)
+            # Parse each upload once; reruns on this page (e.g. clicking
+            # Process) reuse it from the registry instead of re-reading the
+            # whole deck. Session state only keeps (file id, presentation id).
+            parsed = ss.get('parsed_upload')
+            presentation = None
+            if parsed is not None and parsed[0] == uploaded_file.file_id:
+                presentation = _get_presentation(parsed[1])
+            if presentation is None:
+                _discard_parsed_upload()
+                # UploadedFile is already an in-memory BytesIO, so python-pptx
+                # can read it directly without copying the deck into a new buffer
+                uploaded_file.seek(0)
+                presentation = parse_powerpoint(uploaded_file, uploaded_file.name)
+                _store_presentation(presentation)
+                ss.parsed_upload = (uploaded_file.file_id, presentation.id)
             try:
                 
                 # Display presentation info
@@ -124,12 +302,8 @@ def upload_and_process_pptx():
                     st.write("**Presentation Details:**")
                     st.write(f"**Slides:** {len(presentation.slides)}")
                     
-                    # Count items
-                    total_text = sum(len([item for item in slide.items if item.type.value == 'text']) for slide in presentation.slides)
-                    total_images = sum(len([item for item in slide.items if item.type.value == 'image']) for slide in presentation.slides)
-                    
-                    st.write(f"**Text Items:** {total_text}")
-                    st.write(f"**Images:** {total_images}")
+                    st.write(f"**Text Items:** {presentation.text_count}")
+                    st.write(f"**Images:** {presentation.image_count}")
 
                     if len(presentation.slides) > 5:
                         st.write(f"... and {len(presentation.slides) - 5} more slides")
@@ -138,25 +312,37 @@ def upload_and_process_pptx():
                     st.write("**Process PPTX:**")
                     
                     if st.button("🚀 Process Presentation", type="primary", key="process_btn"):
-                        process_presentation(presentation)
+                        next_stage = process_presentation(presentation)
+                        if next_stage:
+                            # process_presentation took over the registry entry
+                            ss.pop('parsed_upload', None)
+                        return next_stage
                 
                 
                     
             except Exception as e:
                 st.error(f"❌ Error processing PowerPoint file: {e}")
+    else:
+        _discard_parsed_upload()
     
 
+def _discard_parsed_upload():
+    """Forget this session's parsed-but-unprocessed upload and free its registry entry."""
+    parsed = ss.pop('parsed_upload', None)
+    if parsed is not None and parsed[1] != ss.get('presentation_id'):
+        _drop_presentation(parsed[1])
+
+
 def mark_image_as_deleted(presentation, image_id):
     """Mark an image as deleted by setting its content to a special marker"""
-    for slide in presentation.slides:
-        for item in slide.items:
-            if item.id == image_id and item.type.value == 'image':
-                item.content = "__DELETED__"
-                return True
+    for item in presentation.images():
+        if item.id == image_id:
+            item.content = "__DELETED__"
+            return True
     return False
 
 def process_presentation(presentation):
-    """Process the presentation and store in database"""
+    """Process the presentation and store in database, returning the next stage"""
     try:
         
         if not initialize_services():
@@ -164,45 +350,74 @@ def process_presentation(presentation):
         
         # Create RAG collection if requested
         collection_id = None
+        image_ids = {}  # image item id -> database image id, shared by every build
         with st.spinner("Creating RAG collection..."):
-            collection_id = ss.rag_core.create_collection(presentation)
+            collection_id = ss.rag_core.create_collection(presentation, image_ids)
             st.success(f"✅ RAG collection created: {collection_id}")
 
-        # Describe images
-        ss.presentation_metadata = (presentation, collection_id)
-        ss.app_stage = "describe_images"
-        st.rerun()
+        # Describe images (replacing any presentation this session left unfinished)
+        _discard_background_embedding(ss.pop('embed_job', None))
+        if ss.get('presentation_id') != presentation.id:
+            _drop_presentation(ss.get('presentation_id'))
+        _store_presentation(presentation)
+        ss.presentation_id = presentation.id
+        ss.collection_id = collection_id
+        ss.image_ids = image_ids
+        return "describe_images"
         
     except Exception as e:
         st.error(f"❌ Error processing presentation: {e}")
 
 
+@st.fragment
+def image_editor(img_item, image_number, show_image=True):
+    """Show one image with its description text area.
+
+    Runs as a fragment so editing a description only reruns this block,
+    not the whole describe page. When an edit changes whether the image
+    counts as described, the whole page is rerun so the Finish / Force
+    Finish choice below reflects it. Pass show_image=False for a repeat of
+    an image already shown in the batch.
+    """
+    was_described = bool(img_item.content) and img_item.content.lower() not in ['none', 'null', '']
+    if show_image:
+        st.image(
+            _thumbnail(img_item.image_bytes, img_item.id),
+            width=1000,  # Set a fixed width for better control
+            caption=f"Slide {img_item.slide_number} - Image {image_number}"
+        )
+    else:
+        st.caption(f"Slide {img_item.slide_number} - Image {image_number} (same image as shown above)")
+
+    # Text area for each image with pre-generated description
+    description = st.text_area(
+        f"What is important about image {image_number}?",
+        key=f"desc_{img_item.id}",
+        value=img_item.content,
+    )
+    img_item.content = description
+
+    is_described = bool(description) and description.lower() not in ['none', 'null', '']
+    if is_described != was_described:
+        st.rerun(scope="app")
+
+
 def describe_images():
     """Describe images"""
+    presentation = _current_presentation()
+    if presentation is None:
+        st.toast("No presentation metadata found. Please upload a presentation first.")
+        return "upload_pptx"
+
     st.header("📋 Describe Images")
     
     # Add back button
     if st.button("← Back to Upload", key="describe_back", use_container_width=True):
         ss.app_stage = "upload_pptx"
         st.rerun()
-    
-    if 'presentation_metadata' not in ss:
-        st.error("No presentation metadata found. Please upload a presentation first.")
-        ss.app_stage = "upload_pptx"
-        st.rerun()
-        return
-    
-    presentation, collection_id = ss.presentation_metadata
 
-    # Extract all images and sort them by slide number and order number to maintain proper sequence
-    all_images = []
-    for slide in presentation.slides:
-        for item in slide.items:
-            if item.type.value == 'image':
-                all_images.append(item)
-    
-    # Sort images by slide number first, then by order number within each slide
-    all_images.sort(key=lambda img: (img.slide_number, img.order_number))
+    # All images, already in slide number / order number sequence
+    all_images = presentation.images()
     
     # Count deleted images before filtering
     deleted_count = len([img for img in all_images if img.content == "__DELETED__"])
@@ -219,10 +434,9 @@ def describe_images():
         with col2:
             if st.button("🔄 Restore All", key="restore_all", help="Restore all deleted images", use_container_width=True):
                 # Restore all deleted images by resetting their content
-                for slide in presentation.slides:
-                    for item in slide.items:
-                        if item.type.value == 'image' and item.content == "__DELETED__":
-                            item.content = 'none'  # Reset to original state
+                for item in presentation.images():
+                    if item.content == "__DELETED__":
+                        item.content = 'none'  # Reset to original state
                 st.success("All images restored!")
                 st.rerun()
     
@@ -230,10 +444,8 @@ def describe_images():
         if deleted_count > 0:
             st.info("All images have been deleted. Click 'Restore All' to bring them back, or continue to create a text-only presentation.")
         else:
-            st.info("No images found in the presentation.")
-            ss.app_stage = "upload_pptx"
-            st.rerun()
-            return
+            st.toast("No images found in the presentation.")
+            return "upload_pptx"
     
     # Initialize current image index if not set
     if 'current_image_index' not in ss:
@@ -255,141 +467,164 @@ def describe_images():
     current_batch_num = (batch_start // BATCH_SIZE) + 1
     total_batches = (total + BATCH_SIZE - 1) // BATCH_SIZE  # Ceiling division
 
+    # Group identical images so each distinct picture is described (and shown) once
+    images_by_hash = {}
+    for img_item in all_images:
+        images_by_hash.setdefault(img_item.image_hash, []).append(img_item)
+
     # Check if all images in current batch have descriptions
     batch_ready = all(img_item.content and img_item.content.lower() not in ['none', 'null', ''] for img_item in current_batch)
 
     if not batch_ready:
-        # Show loading screen while generating descriptions
-        st.write(f"**Processing {total} images in batches of {BATCH_SIZE}**")
-        # Only show progress bar if there are images to process
-        if total > 0:
-            st.progress((idx + 1) / total)
-        st.write(
-                f"**Generating descriptions for images {batch_start + 1} to {batch_end}...**"
-        )
+        # Progress output goes in a placeholder that is cleared once the batch is
+        # described, so the review below renders in this pass without a rerun
+        generation_status = st.empty()
+        with generation_status.container():
+            # Show loading screen while generating descriptions
+            st.write(f"**Processing {total} images in batches of {BATCH_SIZE}**")
+            # Only show progress bar if there are images to process
+            if total > 0:
+                st.progress((idx + 1) / total)
+            st.write(
+                    f"**Generating descriptions for images {batch_start + 1} to {batch_end}...**"
+            )
 
-        with st.spinner("AI is analyzing images and generating descriptions. This may take up to 1 minute per image..."):
-            for i, img_item in enumerate(current_batch):
-                if not img_item.content or img_item.content.lower() in ['none', 'null', '']:
-                    try:
+            with st.spinner("AI is analyzing images and generating descriptions. This may take up to 1 minute per image..."):
+                # Identical images (logos, banners, ...) are only described once
+                pending = []
+                for i, img_item in enumerate(current_batch):
+                    if img_item.content and img_item.content.lower() not in ['none', 'null', '']:
+                        continue
+                    duplicate = next(
+                        (other for other in images_by_hash[img_item.image_hash]
+                         if other.content and other.content.lower() not in ['none', 'null', '']),
+                        None,
+                    )
+                    if duplicate is not None:
+                        img_item.content = duplicate.content
                         st.write(
-                            f"Describing image {batch_start + i + 1} of {total}..."
-                        )
-                        image_description = ss.image_magic.describe_image(
-                            img_item.image_bytes,
-                            img_item.extension,
-                            img_item.slide_number,
-                            collection_id
+                            f"✓ Image {batch_start + i + 1} is identical to an image already described"
                         )
-                        
+                    elif all(img_item.image_hash != other.image_hash for _, other in pending):
+                        pending.append((i, img_item))
+
+                if pending:
+                    st.write(
+                        f"Describing {len(pending)} image(s) of {total}..."
+                    )
+                    # Describe the whole batch concurrently instead of one image at a time
+                    descriptions = ss.image_magic.describe_images(
+                        [img_item.image_bytes for _, img_item in pending],
+                        [img_item.extension for _, img_item in pending],
+                        [img_item.slide_number for _, img_item in pending],
+                        ss.collection_id,
+                        executor=_request_executor(),
+                    )
+
+                    for (i, img_item), image_description in zip(pending, descriptions):
                         # if image_description starts with "Description: " remove it
                         if image_description and image_description.startswith("Description: "):
                             image_description = image_description[len("Description: "):]
-                        
-                        if image_description and image_description != "None":
-                            img_item.content = image_description
+
+                        described = bool(image_description) and image_description != "None"
+                        for same_image in images_by_hash[img_item.image_hash]:
+                            if not same_image.content or same_image.content.lower() in ['none', 'null', '']:
+                                same_image.content = image_description if described else "No description available"
+
+                        if described:
                             st.write(
                                 f"✓ Image {batch_start + i + 1} described successfully"
                             )
                         else:
-                            img_item.content = "No description available"
                             st.write(
                                 f"⚠️ No description generated for image {batch_start + i + 1}"
                             )
-                    except Exception as e:
-                        image_description = f"Error describing image: {e}"
-                        img_item.content = image_description
-                        st.write(
-                            f"✗ Error describing image {batch_start + i + 1}: {e}"
-                        )
 
-        st.success("All descriptions generated! Displaying images...")
-        st.rerun()
-    else:
-        # Display current batch of images with descriptions
-        st.write(
-            f"**Batch {current_batch_num} of {total_batches}: Images {batch_start + 1} to {batch_end} of {total}**"
-        )
-        # Only show progress bar if there are images to process
-        if total > 0:
-            st.progress((batch_end) / total)
+        generation_status.empty()
 
-        for i, img_item in enumerate(current_batch):
-            # Create columns for image info and delete button
-            col_info, col_delete = st.columns([4, 1])
-            
-            with col_info:
-                st.write(
-                    f"**Image {batch_start + i + 1} of {total}** (from Slide {img_item.slide_number})"
-                )
-            
-            with col_delete:
-                if st.button("🗑️ Delete", key=f"delete_{img_item.id}", help="Remove this image from the presentation"):
-                    # Mark image as deleted in the presentation
-                    if mark_image_as_deleted(presentation, img_item.id):
-                        st.success(f"Image {batch_start + i + 1} deleted!")
-                        st.rerun()
-                    else:
-                        st.error("Failed to delete image.")
-            
-            st.image(
-                Image.open(io.BytesIO(img_item.image_bytes)),
-                width=1000,  # Set a fixed width for better control
-                caption=f"Slide {img_item.slide_number} - Image {batch_start + i + 1}"
-            )
+    # Display current batch of images with descriptions
+    st.write(
+        f"**Batch {current_batch_num} of {total_batches}: Images {batch_start + 1} to {batch_end} of {total}**"
+    )
+    # Only show progress bar if there are images to process
+    if total > 0:
+        st.progress((batch_end) / total)
 
-            # Text area for each image with pre-generated description
-            description = st.text_area(
-                f"What is important about image {batch_start + i + 1}?",
-                key=f"desc_{img_item.id}",
-                value=img_item.content,
+    for i, img_item in enumerate(current_batch):
+        # Create columns for image info and delete button
+        col_info, col_delete = st.columns([4, 1])
+        
+        with col_info:
+            st.write(
+                f"**Image {batch_start + i + 1} of {total}** (from Slide {img_item.slide_number})"
             )
-            img_item.content = description
-            st.write("---")
+        
+        with col_delete:
+            if st.button("🗑️ Delete", key=f"delete_{img_item.id}", help="Remove this image from the presentation"):
+                # Mark image as deleted in the presentation
+                if mark_image_as_deleted(presentation, img_item.id):
+                    st.success(f"Image {batch_start + i + 1} deleted!")
+                    st.rerun()
+                else:
+                    st.error("Failed to delete image.")
+        
+        same_images = images_by_hash[img_item.image_hash]
+        first_in_batch = next(j for j, other in enumerate(current_batch) if other.image_hash == img_item.image_hash)
+        if len(same_images) > 1:
+            st.caption(f"This image appears {len(same_images)} times in the presentation.")
+        image_editor(img_item, batch_start + i + 1, show_image=first_in_batch == i)
+        st.write("---")
 
-        # Navigation buttons for batch processing
-        col1, col2, col3 = st.columns(3)
+    # Navigation buttons for batch processing
+    col1, col2, col3 = st.columns(3)
 
-        with col1:
-            if batch_start > 0:
-                if st.button("Previous Batch", key="prev_batch"):
-                    ss.current_image_index = max(0, batch_start - BATCH_SIZE)
-                    st.rerun()
+    with col1:
+        if batch_start > 0:
+            if st.button("Previous Batch", key="prev_batch"):
+                ss.current_image_index = max(0, batch_start - BATCH_SIZE)
+                st.rerun()
 
-        with col2:
-            if st.button("Save Batch", key="save_batch"):
-                # Save all descriptions in current batch
-                for img_item in current_batch:
-                    if img_item.content:
-                        img_item.content = img_item.content
-                st.success("Batch saved!")
-            st.write("Make sure to save the batch before moving to the next batch or finishing.")  
-
-        with col3:
-            if batch_end < total:
-                if st.button("Next Batch", key="next_batch"):
-                    ss.current_image_index = batch_end
+    with col2:
+        if st.button("Save Batch", key="save_batch"):
+            # Save all descriptions in current batch
+            for img_item in current_batch:
+                if img_item.content:
+                    img_item.content = img_item.content
+            st.success("Batch saved!")
+        st.write("Make sure to save the batch before moving to the next batch or finishing.")  
+
+    with col3:
+        if batch_end < total:
+            if st.button("Next Batch", key="next_batch"):
+                ss.current_image_index = batch_end
+                st.rerun()
+        else:
+            # Verify all images have descriptions before finishing
+            all_described = all(
+                img.content and img.content.lower() not in ['none', 'null', ''] 
+                for img in all_images
+            )
+            
+            if all_described:
+                if st.button("Finish", key="finish"):
+                    _start_background_embedding(presentation)
+                    ss.app_stage = "build_quiz_rag"
                     st.rerun()
             else:
-                # Verify all images have descriptions before finishing
-                all_described = all(
-                    img.content and img.content.lower() not in ['none', 'null', ''] 
-                    for img in all_images
-                )
-                
-                if all_described:
-                    if st.button("Finish", key="finish"):
-                        ss.app_stage = "build_quiz_rag"
-                        st.rerun()
-                else:
-                    st.warning("Please ensure all images have descriptions before finishing.")
-                    if st.button("Force Finish", key="force_finish"):
-                        ss.app_stage = "build_quiz_rag"
-                        st.rerun()                      
+                st.warning("Please ensure all images have descriptions before finishing.")
+                if st.button("Force Finish", key="force_finish"):
+                    _start_background_embedding(presentation)
+                    ss.app_stage = "build_quiz_rag"
+                    st.rerun()                      
+
 
-    
 def process_quiz_rag():
     """Process the quiz and RAG"""
+    presentation = _current_presentation()
+    if presentation is None:
+        st.toast("No presentation metadata found. Please upload a presentation first.")
+        return "upload_pptx"
+
     st.header("📋 Process Quiz and RAG")
     
     # Add back button
@@ -397,13 +632,7 @@ def process_quiz_rag():
         ss.app_stage = "describe_images"
         st.rerun()
     
-    if 'presentation_metadata' not in ss:
-        st.error("No presentation metadata found. Please upload a presentation first.")
-        ss.app_stage = "upload_pptx"
-        st.rerun()
-        return
-    
-    presentation, collection_id = ss.presentation_metadata
+    collection_id = ss.collection_id
 
     
 
@@ -413,14 +642,35 @@ def process_quiz_rag():
 
     if st.button("Create"):
         # Create RAG collection (deleted images are already marked in the presentation)
-        with st.spinner("Creating RAG collection..."):
-            try:
-                if collection_id:
-                    ss.rag_core.remove_collection(collection_id)
-            except Exception:
-                pass
-            collection_id = ss.rag_core.create_collection(presentation)        
-            st.success(f"✅ RAG collection created: {collection_id}")
+        with st.status("Creating RAG collection...") as status:
+            content_hash = presentation.content_hash()
+            job = ss.pop('embed_job', None)
+            # Only re-embed when the content actually changed since the collection was built
+            if collection_id and ss.rag_core.get_collection_hash(collection_id) == content_hash:
+                st.success(f"✅ RAG collection is up to date: {collection_id}")
+                _discard_background_embedding(job)
+            else:
+                new_collection_id = None
+                if job and job[0] == content_hash:
+                    # Started when the teacher clicked Finish, so usually done by now
+                    status.update(label="Finishing background embedding...")
+                    try:
+                        new_collection_id = job[1].result()
+                    except Exception as e:
+                        log.debug("background embedding failed, rebuilding: %s", e)
+                else:
+                    _discard_background_embedding(job)
+                if new_collection_id is None:
+                    new_collection_id = ss.rag_core.create_collection(presentation, ss.image_ids)
+                try:
+                    if collection_id:
+                        ss.rag_core.remove_collection(collection_id)
+                except Exception:
+                    pass
+                collection_id = new_collection_id
+                ss.collection_id = collection_id
+                st.success(f"✅ RAG collection created: {collection_id}")
+            status.update(label="RAG collection ready", state="complete")
             
             # Save RAG quizzer to database
             quizzer_data = {
@@ -429,13 +679,17 @@ def process_quiz_rag():
                 'collection_id': collection_id,
                 'presentation_name': presentation.name,
                 'num_slides': len(presentation.slides),
-                'num_text_items': sum(len([item for item in slide.items if item.type.value == 'text']) for slide in presentation.slides),
-                'num_image_items': sum(len([item for item in slide.items if item.type.value == 'image' and item.content != "__DELETED__"]) for slide in presentation.slides),
+                'num_text_items': presentation.text_count,
+                'num_image_items': sum(1 for item in presentation.images() if item.content != "__DELETED__"),
                 'slides': [{'slide_number': slide.slide_number, 'content': [item.content for item in slide.items if item.content != "__DELETED__"]} for slide in presentation.slides]
             }
             
             quizzer_id = ss.homework_server.create_rag_quizzer(quizzer_data)
             if quizzer_id:
+                _drop_presentation(ss.presentation_id)
+                del ss.presentation_id
+                del ss.collection_id
+                ss.image_ids = {}
                 st.success(f"✅ RAG quizzer saved to database with ID: {quizzer_id}")
             else:
                 st.error("❌ Failed to save RAG quizzer to database")
@@ -503,24 +757,17 @@ def generate_homework():
                     
                     quiz_master = QuizMaster(rag_core)
                     
-                    # Generate questions based on specified counts
-                    generated_questions = []
-                    
-                    # Generate text questions first
-                    text_questions_generated = 0
-                    for i in range(num_text_questions):
-                        question = quiz_master.generate_text_question(selected_quizzer['collection_id'])
-                        if question:
-                            generated_questions.append(question)
-                            text_questions_generated += 1
-                    
-                    # Generate image questions
-                    image_questions_generated = 0
-                    for i in range(num_image_questions):
-                        question = quiz_master.generate_image_question(selected_quizzer['collection_id'])
-                        if question:
-                            generated_questions.append(question)
-                            image_questions_generated += 1
+                    # Each question is an independent Gemini round trip, so
+                    # generate them concurrently (text questions first, as before)
+                    jobs = (
+                        [quiz_master.generate_text_question] * num_text_questions
+                        + [quiz_master.generate_image_question] * num_image_questions
+                    )
+                    results = list(_request_executor().map(lambda job: job(selected_quizzer['collection_id']), jobs))
+
+                    generated_questions = [question for question in results if question]
+                    text_questions_generated = sum(1 for question in results[:num_text_questions] if question)
+                    image_questions_generated = sum(1 for question in results[num_text_questions:] if question)
                     
                     # Show generation summary
                     st.info(f"📊 Generated {text_questions_generated} text questions and {image_questions_generated} image questions")
@@ -554,8 +801,7 @@ def generate_homework():
                 st.write(question_data["question"])
                 if question_data["type"] == "image" and "image_bytes" in question_data:
                     try:
-                        import base64
-                        image_bytes = base64.b64decode(question_data["image_bytes"])
+                        image_bytes = _question_thumbnail(question_data["image_bytes"])
                         st.image(image_bytes, caption="Question Image", width=1000)
                     except Exception as e:
                         st.warning(f"Could not display image: {e}")
@@ -581,8 +827,8 @@ def generate_homework():
                     # When saving a new assignment, store only the assignment ID
                     assignment_id = ss.homework_server.create_assignment(homework_assignment)
                     if assignment_id:
-                        print(f"🔍 assignment created successfully");
-                        ss.homework_assignments.append(assignment_id)
+                        log.debug("assignment %s created successfully", assignment_id)
+                        _cached_assignments.clear()
                         st.success("✅ Homework assignment saved!")
                     else:
                         st.error("❌ Failed to create assignment!")
@@ -601,9 +847,9 @@ def manage_assignments():
     
     st.subheader("Current Assignments")
     
-    # Fetch assignments for this teacher from DB
-    assignments = ss.homework_server.get_assignments_by_teacher(ss.current_user['id'])
-    
+    # Fetch assignments for this teacher (cached between reruns)
+    assignments = _load_assignments(ss.current_user['id'])
+
     if not assignments:
         st.info("📝 No homework assignments created yet.")
     else:
@@ -627,15 +873,16 @@ def manage_assignments():
                 
                 col1, col2 = st.columns(2)
                 with col1:
-                    if st.button(f"📊 View Results", key=f"view_{i}"):
+                    if st.button(f"📊 View Results", key=f"view_{assignment['id']}"):
                         ss.selected_assignment_for_results = assignment
                         ss.app_stage = "view_results"
                         st.rerun()
                 with col2:
-                    if st.button(f"🗑️ Delete", key=f"delete_{i}"):
+                    if st.button(f"🗑️ Delete", key=f"delete_{assignment['id']}"):
                         # Delete from DB
                         success = ss.homework_server.delete_assignment(assignment['id'])
                         if success:
+                            _cached_assignments.clear()
                             st.success("✅ Assignment deleted!")
                             st.rerun()
                         else:
@@ -650,10 +897,8 @@ def view_assignment_results():
     """View detailed results for a specific assignment"""
     assignment = ss.selected_assignment_for_results
     if not assignment:
-        st.error("No assignment selected for results viewing.")
-        ss.app_stage = "dashboard"
-        st.rerun()
-        return
+        st.toast("No assignment selected for results viewing.")
+        return "dashboard"
     
     st.header(f"📊 Assignment Results: {assignment['name']}")
     st.caption(f"Assignment ID: {assignment['id']} | Created: {assignment.get('created_at', 'Unknown')}")
@@ -763,7 +1008,7 @@ def remove_powerpoint():
     
     st.subheader("Current Presentations")
     
-    for i, rag_quizzer in enumerate(rag_quizzers):
+    for rag_quizzer in rag_quizzers:
         with st.expander(f"📄 {rag_quizzer['name']}"):
             st.write(f"**Slides:** {rag_quizzer['num_slides']}")
             st.write(f"**Text Items:** {rag_quizzer['num_text_items']}")
@@ -772,7 +1017,7 @@ def remove_powerpoint():
             # Warning about deletion
             st.warning("⚠️ This will permanently remove the presentation and all associated data.")
             
-            if st.button(f"🗑️ Remove", key=f"remove_{i}"):
+            if st.button(f"🗑️ Remove", key=f"remove_{rag_quizzer['id']}"):
                 try:
                     # Remove from RAG core if collection exists
                     if ss.rag_core and rag_quizzer['collection_id']:
@@ -852,22 +1097,30 @@ st.write(f"Welcome, {ss.current_user['first_name']} {ss.current_user['last_name'
     
 
 # Main content based on selected page
-if ss.app_stage == "dashboard":
-    dashboard()
-elif ss.app_stage == "upload_pptx":
-    upload_and_process_pptx()
-elif ss.app_stage == "describe_images":
-    describe_images()
-elif ss.app_stage == "build_quiz_rag":
-    process_quiz_rag()
-elif ss.app_stage == "generate_homework":
-    generate_homework()
-elif ss.app_stage == "manage_assignments":
-    manage_assignments()
-elif ss.app_stage == "view_results":
-    view_assignment_results()
-elif ss.app_stage == "remove_powerpoint":
-    remove_powerpoint()
+STAGES = {
+    "dashboard": dashboard,
+    "upload_pptx": upload_and_process_pptx,
+    "describe_images": describe_images,
+    "build_quiz_rag": process_quiz_rag,
+    "generate_homework": generate_homework,
+    "manage_assignments": manage_assignments,
+    "view_results": view_assignment_results,
+    "remove_powerpoint": remove_powerpoint,
+}
+
+# A stage returns the next stage when it redirects without user input; that
+# stage is drawn over it in the same pass instead of paying for a full rerun.
+# Revisiting a stage would duplicate its widgets, so that case still reruns.
+stage_area = st.empty()
+visited_stages = set()
+next_stage = ss.app_stage
+while next_stage:
+    ss.app_stage = next_stage
+    if next_stage in visited_stages:
+        st.rerun()
+    visited_stages.add(next_stage)
+    with stage_area.container():
+        next_stage = STAGES[next_stage]()
 
 # Footer
 st.markdown("---")
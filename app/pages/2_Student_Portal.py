@@ -1,7 +1,6 @@
 import streamlit as st
 import os
 import sys
-import base64
 from typing import Dict, List
 from datetime import datetime
 
@@ -44,22 +43,24 @@ if "homework_server" not in ss:
     ss.homework_server = HomeworkServer()
 if "user_server" not in ss:
     ss.user_server = UserServer()
-if "current_user" not in ss:
-    ss.current_user = None
 if "rag_core" not in ss:
     ss.rag_core = RAGCore()
 if "quiz_master" not in ss:
     ss.quiz_master = QuizMaster(ss.rag_core)
-if "page" not in ss:
-    ss.page = "assignments"
-if "current_assignment" not in ss:
-    ss.current_assignment = None
-if "submission" not in ss:
-    ss.submission = None
-if "answers_draft" not in ss:
-    ss.answers_draft = {}  # question_id -> str
-if "attempts_used" not in ss:
-    ss.attempts_used = {}  # question_id -> int
+
+for key, default in {
+    "current_user": None,
+    "page": "assignments",
+    "current_assignment": None,
+    "submission": None,
+    "answers_draft": {},  # question_id -> str
+    "attempts_used": {},  # question_id -> int
+    "assignments_page": 0,
+}.items():
+    ss.setdefault(key, default)
+
+# Assignments listed per page on the "Available Assignments" screen
+ASSIGNMENTS_PER_PAGE = 20
 
 
 def load_assignment(assignment_id: int):
@@ -90,10 +91,18 @@ def load_assignment(assignment_id: int):
 
 def view_assignments():
     st.header("📚 Available Assignments")
-    assignments = ss.homework_server.list_assignments()
+    # Fetch one extra row to know whether there is a next page
+    assignments = ss.homework_server.list_assignments_cached(
+        limit=ASSIGNMENTS_PER_PAGE + 1, offset=ss.assignments_page * ASSIGNMENTS_PER_PAGE
+    )
+    if not assignments and ss.assignments_page > 0:
+        ss.assignments_page = 0
+        st.rerun()
     if not assignments:
         st.info("No assignments available yet.")
         return
+    has_next_page = len(assignments) > ASSIGNMENTS_PER_PAGE
+    assignments = assignments[:ASSIGNMENTS_PER_PAGE]
     
     for a in assignments:
         # Check if student has a completed submission for this assignment
@@ -122,6 +131,20 @@ def view_assignments():
                 ss.page = "take"
                 st.rerun()
 
+    # Pagination controls
+    if ss.assignments_page > 0 or has_next_page:
+        col_prev, col_page, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            if ss.assignments_page > 0 and st.button("← Previous", key="assignments_prev"):
+                ss.assignments_page -= 1
+                st.rerun()
+        with col_page:
+            st.caption(f"Page {ss.assignments_page + 1}")
+        with col_next:
+            if has_next_page and st.button("Next →", key="assignments_next"):
+                ss.assignments_page += 1
+                st.rerun()
+
 
 def display_completed_assignment(assignment, submission):
     """Display a completed assignment with all attempts and grades."""
@@ -136,8 +159,12 @@ def display_completed_assignment(assignment, submission):
     answers_by_q = ss.homework_server.get_submission_answers(submission['id'])
     
     # Load image bytes for questions
-    image_qs = ss.homework_server.get_assignment_questions(assignment['id'], include_image_bytes=True)
-    image_lookup = {item['id']: item for item in image_qs}
+    # Keep only the questions that actually have an image
+    image_lookup = {
+        item['id']: item
+        for item in ss.homework_server.iter_assignment_questions(assignment['id'], include_image_bytes=True)
+        if item.get('image_bytes')
+    }
     
     # Show all questions with their attempts
     for question_index, q in enumerate(assignment.get("questions", []), 1):
@@ -148,10 +175,10 @@ def display_completed_assignment(assignment, submission):
         if q.get("type") == "image":
             st.caption("This was an image-based question.")
             img_info = image_lookup.get(qid)
-            img_b64 = img_info.get("image_bytes") if img_info else None
-            if img_b64:
+            img_bytes = img_info.get("image_bytes") if img_info else None
+            if img_bytes:
                 try:
-                    st.image(base64.b64decode(img_b64), width=1000, caption="Question Image")
+                    st.image(img_bytes, width=1000, caption="Question Image")
                 except Exception:
                     st.warning("Unable to display image preview.")
         
@@ -316,9 +343,13 @@ def take_assignment():
     # Load current attempts from DB for display and gating
     answers_by_q = ss.homework_server.get_submission_answers(submission['id'])
 
-    # Load image bytes for questions (base64) when available
-    image_qs = ss.homework_server.get_assignment_questions(assignment['id'], include_image_bytes=True)
-    image_lookup = {item['id']: item for item in image_qs}
+    # Load raw image bytes for questions when available
+    # Keep only the questions that actually have an image
+    image_lookup = {
+        item['id']: item
+        for item in ss.homework_server.iter_assignment_questions(assignment['id'], include_image_bytes=True)
+        if item.get('image_bytes')
+    }
 
     # Determine current attempt state
     total_questions = len(assignment.get("questions", []))
@@ -344,10 +375,10 @@ def take_assignment():
         if q.get("type") == "image":
             st.caption("This is an image-based question. Answer based on the image context.")
             img_info = image_lookup.get(qid)
-            img_b64 = img_info.get("image_bytes") if img_info else None
-            if img_b64:
+            img_bytes = img_info.get("image_bytes") if img_info else None
+            if img_bytes:
                 try:
-                    st.image(base64.b64decode(img_b64), width=1000, caption="Question Image")
+                    st.image(img_bytes, width=1000, caption="Question Image")
                 except Exception:
                     st.warning("Unable to display image preview for this question.")
         else:
@@ -5,6 +5,9 @@ import streamlit as st
 from typing import List, Dict, Any, Optional
 import hashlib
 import time
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 
 
 class ImageMagic:
@@ -12,10 +15,12 @@ class ImageMagic:
     def __init__(self, rag_core: RAGCore):
         self.rag_core = rag_core
         self.image_server = ImageServer()
-        self.chat_history = []
-        self.context_cache = {}
-        self.lambda_index = {}
         self.max_chat_history = 10
+        self.chat_history = deque(maxlen=self.max_chat_history)
+        self.context_cache = OrderedDict()  # LRU of finished descriptions
+        self.max_cache_entries = 128
+        self._cache_lock = threading.Lock()
+        self.lambda_index = {}
         self.cache_ttl = 3600  # 1 hour cache TTL
 
     def describe_image(self, image_bytes: bytes, image_format: str = "png", slide_number: int = 0, collection_id: str = None, use_chat: bool = True):
@@ -39,11 +44,12 @@ class ImageMagic:
         # Generate image hash for caching
         image_hash = self._generate_image_hash(image_bytes)
         
-        # Check cache first
-        cache_key = f"{image_hash}_{slide_number}_{collection_id}"
-        if cache_key in self.context_cache:
-            cached_result = self.context_cache[cache_key]
-            if time.time() - cached_result['timestamp'] < self.cache_ttl:
+        # Check cache first (chat and no-chat descriptions differ, so both are keyed)
+        cache_key = (image_hash, slide_number, collection_id, use_chat)
+        with self._cache_lock:
+            cached_result = self.context_cache.get(cache_key)
+            if cached_result and time.monotonic() - cached_result['timestamp'] < self.cache_ttl:
+                self.context_cache.move_to_end(cache_key)
                 return cached_result['description']
 
         # Stage 1: Get OCR description
@@ -91,17 +97,69 @@ class ImageMagic:
                 # If JSON parsing fails, try to extract description from the text
                 pass
 
-        # Cache the result
-        self.context_cache[cache_key] = {
-            'description': final_description,
-            'timestamp': time.time()
-        }
+        # Cache the result, evicting the least recently used entry when full
+        with self._cache_lock:
+            self.context_cache[cache_key] = {
+                'description': final_description,
+                'timestamp': time.monotonic()
+            }
+            self.context_cache.move_to_end(cache_key)
+            while len(self.context_cache) > self.max_cache_entries:
+                self.context_cache.popitem(last=False)
 
         return final_description
 
+    def describe_images(
+        self,
+        image_bytes_list: List[bytes],
+        image_format="png",
+        slide_numbers: Optional[List[int]] = None,
+        collection_id: str = None,
+        use_chat: bool = True,
+        max_workers: int = 4,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ) -> List[Optional[str]]:
+        """
+        Describes several images concurrently, each through the describe_image pipeline.
+
+        Args:
+            image_bytes_list (List[bytes]): The image data for each image
+            image_format (str | List[str]): One format for all images, or one per image
+            slide_numbers (List[int]): The slide number of each image (defaults to 0)
+            collection_id (str): The collection ID to query for context
+            use_chat (bool): Whether to use chat history for context
+            max_workers (int): Maximum number of images described at once
+            executor (ThreadPoolExecutor): Shared pool to run on instead of a
+                temporary one (max_workers is then ignored)
+
+        Returns:
+            List[Optional[str]]: Descriptions in the same order as image_bytes_list,
+            None for images that could not be described
+        """
+        if not image_bytes_list:
+            return []
+
+        count = len(image_bytes_list)
+        formats = [image_format] * count if isinstance(image_format, str) else list(image_format)
+        slide_numbers = list(slide_numbers) if slide_numbers is not None else [0] * count
+
+        def describe(index: int) -> Optional[str]:
+            try:
+                return self.describe_image(
+                    image_bytes_list[index], formats[index], slide_numbers[index], collection_id, use_chat
+                )
+            except Exception as e:
+                print(f"Error describing image {index + 1}: {e}")
+                return None
+
+        if executor is not None:
+            return list(executor.map(describe, range(count)))
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, count))) as pool:
+            return list(pool.map(describe, range(count)))
+
     def _generate_image_hash(self, image_bytes: bytes) -> str:
-        """Generate a hash for the image for caching purposes."""
-        return hashlib.md5(image_bytes).hexdigest()
+        """Generate a content hash for the image, used for caching and the Lambda Index query."""
+        return hashlib.blake2b(image_bytes, digest_size=16).hexdigest()
 
     def ocr_image(self, image_bytes: bytes):
         """
@@ -147,7 +205,7 @@ class ImageMagic:
         # Add chat history if enabled
         chat_context = ""
         if use_chat and self.chat_history:
-            chat_context = "\n\nPrevious Context:\n" + "\n".join([f"- {msg}" for msg in self.chat_history[-3:]])
+            chat_context = "\n\nPrevious Context:\n" + "\n".join([f"- {msg}" for msg in list(self.chat_history)[-3:]])
 
         prompt = f"""<prompt>
                         <instructions>
@@ -379,7 +437,7 @@ class ImageMagic:
         # Build chat context
         chat_context = ""
         if use_chat and self.chat_history:
-            chat_context = "\n\nChat History:\n" + "\n".join([f"- {msg}" for msg in self.chat_history[-5:]])
+            chat_context = "\n\nChat History:\n" + "\n".join([f"- {msg}" for msg in list(self.chat_history)[-5:]])
 
         prompt = f"""<prompt>
                         <instructions>
@@ -436,20 +494,17 @@ class ImageMagic:
 
     def _add_to_chat_history(self, message: str):
         """
-        Add message to chat history with size management.
+        Add message to chat history; the deque drops the oldest message
+        once max_chat_history is reached.
         
         Args:
             message (str): Message to add to chat history
         """
         self.chat_history.append(message)
-        
-        # Keep only the last N messages
-        if len(self.chat_history) > self.max_chat_history:
-            self.chat_history = self.chat_history[-self.max_chat_history:]
 
     def clear_chat_history(self):
         """Clear the chat history."""
-        self.chat_history = []
+        self.chat_history.clear()
 
     def get_chat_history(self) -> List[str]:
         """
@@ -458,7 +513,7 @@ class ImageMagic:
         Returns:
             List[str]: List of chat messages
         """
-        return self.chat_history.copy()
+        return list(self.chat_history)
 
     def get_context_from_enhanced_description(
         self, enhanced_description: str, collection_id: str, n_results: int = 3
@@ -533,12 +588,13 @@ class ImageMagic:
             "cache_size": len(self.context_cache),
             "chat_history_size": len(self.chat_history),
             "lambda_index_size": len(self.lambda_index),
-            "cache_hits": sum(1 for cache in self.context_cache.values() if time.time() - cache['timestamp'] < self.cache_ttl)
+            "cache_hits": sum(1 for cache in list(self.context_cache.values()) if time.monotonic() - cache['timestamp'] < self.cache_ttl)
         }
 
     def clear_cache(self):
         """Clear the context cache."""
-        self.context_cache = {}
+        with self._cache_lock:
+            self.context_cache.clear()
 
     def set_cache_ttl(self, ttl_seconds: int):
         """
@@ -556,6 +612,7 @@ class ImageMagic:
         Args:
             max_history (int): Maximum number of chat messages to keep
         """
-        self.max_chat_history = max_history 
+        self.max_chat_history = max_history
+        self.chat_history = deque(self.chat_history, maxlen=max_history)
         
         
\ No newline at end of file
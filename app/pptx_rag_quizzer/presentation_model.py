@@ -1,3 +1,5 @@
+import functools
+import hashlib
 import pydantic
 from enum import Enum
 from typing import List, Union
@@ -17,6 +19,11 @@ class Image(SlideItem):
     image_bytes: bytes
     extension: str
 
+    @functools.cached_property
+    def image_hash(self) -> str:
+        """SHA-256 of the image bytes, used to spot the same picture reused across slides."""
+        return hashlib.sha256(self.image_bytes).hexdigest()
+
     def metadata(self):
         return {
             "type": Type.image.value,
@@ -46,3 +53,32 @@ class Presentation(pydantic.BaseModel):
     name: str
     slides: List[Slide]
 
+    @property
+    def text_count(self) -> int:
+        return sum(1 for slide in self.slides for item in slide.items if item.type == Type.text)
+
+    @property
+    def image_count(self) -> int:
+        return sum(1 for slide in self.slides for item in slide.items if item.type == Type.image)
+
+    def images(self) -> List[Image]:
+        """All image items, in slide and reading order."""
+        return [item for slide in self.slides for item in slide.items if item.type == Type.image]
+
+    def content_hash(self) -> str:
+        """
+        Hash of the content that ends up in the RAG collection.
+
+        Deleted images are skipped, matching RAGCore.create_collection, so two
+        presentations with the same hash produce the same embeddings.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for slide in self.slides:
+            for item in slide.items:
+                if item.content == "__DELETED__":
+                    continue
+                digest.update(item.content.encode())
+                digest.update(b"\x00")
+            digest.update(b"\x01")
+        return digest.hexdigest()
+
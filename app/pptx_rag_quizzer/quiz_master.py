@@ -1,6 +1,5 @@
 import re
 import time
-import base64
 from database.db_psql import ImageServer
 from pptx_rag_quizzer.rag_core import RAGCore
 
@@ -102,26 +101,19 @@ class QuizMaster:
             "context": "The capital of France is Paris.",
             "type": "image",
             "image_extension": "png",
-            "image_bytes": "base64_encoded_image_bytes"
+            "image_bytes": b"raw image bytes"
         }
         """
         try:
             chunk = self.rag_core.get_random_slide_with_image(collection_id)
             if isinstance(chunk, dict):
                 context = chunk["documents"]
-                metadata = chunk["metadatas"]
+                image_id = chunk["image_id"]
+                image_extension = chunk["image_extension"]
             else:
                 print("No image context available")
                 return None
             
-            image_id = None
-            image_extension = None
-            for key, value in metadata.items():
-                if key.endswith("image_id"):
-                    image_id = value
-                if key.endswith("image_extension"):
-                    image_extension = value
-            
             if image_id is not None:
                 # Fetch image from DB using new unified structure
                 fetched = self.image_server.get_image(image_id)
@@ -171,15 +163,13 @@ class QuizMaster:
                 question = question_match.group(1)
                 answer = answer_match.group(1)
 
-                image_bytes_encoded = base64.b64encode(image_bytes).decode("utf-8")
-
                 question_data = {
                     "question": question,
                     "answer": answer,
                     "context": context,
                     "type": "image",
                     "image_extension": image_extension,
-                    "image_bytes": image_bytes_encoded,
+                    "image_bytes": image_bytes,
                 }
                 return question_data
             else:
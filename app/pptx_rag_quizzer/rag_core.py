@@ -1,4 +1,7 @@
 import chromadb
+from chromadb.utils import embedding_functions
+import diskcache
+import hashlib
 import uuid
 import random
 import os
@@ -13,8 +16,13 @@ from database.db_psql import ImageServer
 
 load_dotenv()
 
+# Chroma's default embedding function; collections are queried with it too
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+
 _llm_model_cache = None
 _chroma_db_client_cache = None
+_embedding_function_cache = None
+_embedding_disk_cache = None
 
 
 def get_chroma_db_client():
@@ -33,6 +41,30 @@ def get_chroma_db_client():
         print("Using cached ChromaDB client")
     return _chroma_db_client_cache
 
+def get_embedding_function():
+    """
+    Returns the embedding function used to build collections (Chroma's default model).
+    """
+    global _embedding_function_cache
+
+    if _embedding_function_cache is None:
+        _embedding_function_cache = embedding_functions.DefaultEmbeddingFunction()
+    return _embedding_function_cache
+
+def get_embedding_disk_cache():
+    """
+    Configures the on-disk embedding cache using the EMBEDDING_CACHE_DIR environment variable.
+    Embeddings survive restarts, so re-uploading a deck doesn't re-embed unchanged slides.
+    """
+    global _embedding_disk_cache
+
+    if _embedding_disk_cache is None:
+        load_dotenv()
+        cache_dir = os.getenv("EMBEDDING_CACHE_DIR", ".embedding_cache")
+        _embedding_disk_cache = diskcache.Cache(cache_dir)
+        print(f"✅ Embedding cache initialized (dir={cache_dir})")
+    return _embedding_disk_cache
+
 def get_llm_model():
     """
     Configures the Google Generative AI model using the GOOGLE_API_KEY environment variable.
@@ -77,10 +109,33 @@ class RAGCore:
 
         self.chroma_client = get_chroma_db_client()
 
-    def create_collection(self, data: Presentation):
+    def upload_images(self, data: Presentation, image_ids: dict = None):
+        """
+        Uploads the presentation's images (except deleted ones) to the database.
+
+        Args:
+            image_ids (dict): Image item id -> database image id of images that
+                are already uploaded. These are reused, and new uploads are added.
+
+        Returns:
+            dict: Image item id -> database image id.
+        """
+        image_ids = {} if image_ids is None else image_ids
+        image_server = ImageServer()
+        for item in data.images():
+            if item.content != "__DELETED__" and item.id not in image_ids:
+                image_id = image_server.upload_image(item.image_bytes)
+                if image_id is not None:
+                    image_ids[item.id] = image_id
+        return image_ids
+
+    def create_collection(self, data: Presentation, image_ids: dict = None):
         """
         Builds the vector database from the Presentation object.
 
+        Pass the same image_ids dict (see upload_images) to every build of a
+        presentation so its images are only stored in the database once.
+
         Returns:
             str: The collection id.
         """
@@ -88,7 +143,7 @@ class RAGCore:
         all_texts = []
         all_ids = []
         all_metadatas = []
-        image_server = ImageServer()
+        image_ids = self.upload_images(data, image_ids)
 
         for slide in data.slides:
 
@@ -119,8 +174,7 @@ class RAGCore:
                 # Add additional fields for images
                 if metadata["type"] == "image":
                     combined_metadata[f"item_{item_num}_image_extension"] = metadata["extension"]
-                    image_id = image_server.upload_image(metadata["image_bytes"], metadata.get("image_extension"), metadata.get("content_type"))
-                    combined_metadata[f"item_{item_num}_image_id"] = image_id
+                    combined_metadata[f"item_{item_num}_image_id"] = image_ids.get(metadata["image_id"])
 
             combined_metadata["slide_number"] = slide.slide_number
             combined_metadata["slide_id"] = slide.id
@@ -133,17 +187,58 @@ class RAGCore:
         
         collection_id = str(uuid.uuid4())
 
-        self.chroma_client.create_collection(name=collection_id)
+        self.chroma_client.create_collection(
+            name=collection_id,
+            metadata={"content_hash": data.content_hash()},
+        )
         
 
         self.chroma_client.get_collection(name=collection_id).add(
             documents=all_texts,
+            embeddings=self.embed_documents(all_texts),
             metadatas=all_metadatas,
             ids=all_ids
         )   
 
         return collection_id
 
+    def embed_documents(self, texts):
+        """
+        Embeds the texts, reusing vectors from the on-disk cache where possible.
+        Only cache misses are sent to the embedding model.
+
+        Returns:
+            list: One embedding (list of floats) per text, in order.
+        """
+        disk_cache = get_embedding_disk_cache()
+        keys = [
+            hashlib.blake2b(f"{EMBEDDING_MODEL_NAME}\x00{text}".encode()).hexdigest()
+            for text in texts
+        ]
+        embeddings = [disk_cache.get(key) for key in keys]
+
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            computed = get_embedding_function()([texts[i] for i in missing])
+            for i, vector in zip(missing, computed):
+                embeddings[i] = [float(x) for x in vector]
+                disk_cache.set(keys[i], embeddings[i])
+
+        return embeddings
+
+    def get_collection_hash(self, collection_id: str):
+        """
+        This function is used to get the content hash a collection was built from.
+
+        returns:
+            str: The content hash, or None if the collection is missing or predates hashing.
+        """
+        try:
+            collection = self.chroma_client.get_collection(name=collection_id)
+        except Exception:
+            return None
+        return (collection.metadata or {}).get("content_hash")
+
     def remove_collection(self, collection_id: str):
         """
         This function is used to remove a collection.
@@ -202,6 +297,8 @@ class RAGCore:
         """
         This function gets the context of a random image document
         from a Chroma collection, retrying if necessary.
+        The result also carries the slide image's database image_id and
+        image_extension.
         """
         max_attempts = 10
         attempts = 0
@@ -229,10 +326,17 @@ class RAGCore:
                         # Convert to string if it's not already
                         document = str(document)
                     
+                    # Resolve the slide's (last) image here so callers don't
+                    # have to scan the metadata keys for it
+                    image_key = next((k for k in reversed(list(metadata)) if k.endswith("_image_id")), None)
+                    image_prefix = image_key[:-len("image_id")] if image_key else None
+
                     return {
                         "metadatas": metadata,
                         "documents": document,
-                        "ids": data["ids"][idx]
+                        "ids": data["ids"][idx],
+                        "image_id": metadata[image_key] if image_key else None,
+                        "image_extension": metadata.get(f"{image_prefix}image_extension") if image_key else None,
                     }
 
                 attempts += 1
@@ -341,10 +445,9 @@ class RAGCore:
                 img = img.convert("RGB")
 
             # Save as PNG to ensure compatibility
-            img_buffer = io.BytesIO()
-            img.save(img_buffer, format="PNG")
-            img_buffer.seek(0)
-            validated_image_bytes = img_buffer.getvalue()
+            with io.BytesIO() as img_buffer:
+                img.save(img_buffer, format="PNG")
+                validated_image_bytes = img_buffer.getvalue()
             validated_format = "png"
 
         except Exception as e:
@@ -3,7 +3,11 @@ import google.generativeai as genai
 from google.generativeai.types import GenerationConfig
 import pytesseract
 from PIL import Image
+import functools
 import io
+import os
+import re
+import tempfile
 
 
 def ExtractText_OCR(img_bytes):
@@ -17,6 +21,19 @@ def ExtractText_OCR(img_bytes):
         str: The extracted text from the image.
     """
     try:
+        # Tesseract reads PNG and JPEG files itself, so hand those over as-is
+        # instead of decoding with PIL only for pytesseract to re-encode them
+        suffix = _tesseract_file_suffix(img_bytes)
+        if suffix:
+            with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as f:
+                f.write(img_bytes)
+                path = f.name
+            try:
+                text = pytesseract.image_to_string(path)
+            finally:
+                os.remove(path)
+            return text.strip()
+
         # Extract text using OCR (Tesseract)
         img = Image.open(io.BytesIO(img_bytes))
         text = pytesseract.image_to_string(img)
@@ -27,17 +44,43 @@ def ExtractText_OCR(img_bytes):
         return ""
 
 
+def _tesseract_file_suffix(img_bytes):
+    """File suffix for image bytes Tesseract can read directly, or None."""
+    if img_bytes[:8] == b"\x89PNG\r\n\x1a\n":
+        return ".png"
+    if img_bytes[:3] == b"\xff\xd8\xff":
+        return ".jpg"
+    return None
+
+
 def clean_text(text):
     """
     Cleans the text by removing any non-essential information.
     """
-    return "\n".join(line for line in text.splitlines() if line.strip())
+    # filter(str.strip, ...) keeps the whole scan in C; it measured faster than
+    # both the generator and a compiled blank-line regex
+    return "\n".join(filter(str.strip, text.splitlines()))
+
+
+# Boilerplate that is worth sending to the LLM even when the text is short
+_BOILERPLATE = re.compile(r"slide \d+|copyright|©", re.I)
 
 
 def clean_text_with_llm(text, model):
     """
     Cleans the text by removing any non-essential information using LLM (Gemini-2.0-flash-lite).
+    Short text without boilerplate is only cleaned locally, and repeated
+    inputs reuse the earlier LLM result.
     """
+    stripped = clean_text(text)
+    if len(stripped) < 200 and not _BOILERPLATE.search(stripped):
+        return stripped
+    return _clean_text_with_llm(text, model)
+
+
+@functools.lru_cache(maxsize=1024)
+def _clean_text_with_llm(text, model):
+    """Gemini call behind clean_text_with_llm, cached per (text, model)."""
     generation_config = GenerationConfig(max_output_tokens=100)
 
     result = model.generate_content(